@@ -138,6 +138,43 @@ def get_user_role(email):
         print(f"❌ Error: {str(e)}")
         return None
 
+def rebuild_statistics():
+    """Rebuild counter statistik dashboard dari tabel users & analysis_history"""
+    try:
+        from database import rebuild_statistics as rebuild
+        stats = rebuild()
+        
+        print("✅ Statistik dashboard berhasil di-rebuild")
+        print(f"   Total users          : {stats['total_users']}")
+        print(f"   Admin / User         : {stats['admin_count']} / {stats['user_count']}")
+        print(f"   Total klasifikasi    : {stats['total_classifications']}")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
+def import_legacy_history(path="analysis_history.json"):
+    """Import riwayat analisis lama (analysis_history.json) ke database"""
+    try:
+        from database import import_legacy_history as run_import
+        summary = run_import(path)
+        
+        if summary['resumed_from']:
+            print(f"⏩ Melanjutkan dari record ke-{summary['resumed_from']}")
+        print(f"✅ Import selesai: {summary['records']} record, {summary['rows_imported']} hasil baru, "
+              f"{summary['duplicates']} duplikat dilewati")
+        if summary['new_classes']:
+            print(f"⚠️ Kelas penyakit baru dari file lama: {', '.join(summary['new_classes'])}")
+        return True
+    
+    except FileNotFoundError:
+        print(f"❌ File '{path}' tidak ditemukan")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
 def main():
     """Main menu"""
     print("""
@@ -150,11 +187,13 @@ Pilih opsi:
 2. 👤 Demote admin menjadi user
 3. 📋 List semua users
 4. 🔍 Cek role user
-5. ❌ Keluar
+5. 🔄 Rebuild statistik dashboard
+6. 📥 Import analysis_history.json ke database
+7. ❌ Keluar
 
 """)
     
-    choice = input("Pilih opsi (1-5): ").strip()
+    choice = input("Pilih opsi (1-7): ").strip()
     
     if choice == '1':
         email = input("Masukkan email user yang akan dipromote: ").strip()
@@ -172,6 +211,12 @@ Pilih opsi:
         get_user_role(email)
     
     elif choice == '5':
+        rebuild_statistics()
+    
+    elif choice == '6':
+        import_legacy_history()
+    
+    elif choice == '7':
         print("👋 Keluar...")
         sys.exit(0)
     
@@ -1,4 +1,8 @@
 # app.py - Main Entry Point
+import os
+import time
+_rerun_start = time.perf_counter()
+
 import streamlit as st
 
 # Configure page FIRST, before any other streamlit calls
@@ -13,17 +17,24 @@ from auth import init_session_state, get_current_role, is_authenticated, is_admi
 from login import login_page
 from responsive_ui import apply_responsive_theme, responsive_hero, responsive_button_grid, add_footer
 from navigation import create_navigation_sidebar, show_role_info
-from database import init_database
+from database import ensure_database, get_startup_report
 
 # Apply responsive theme
 apply_responsive_theme()
 
-# Initialize database on startup
-init_database()
+# Bootstrap database schema once per process (no-op on reruns)
+ensure_database()
 
 # Initialize session state
 init_session_state()
 
+# Startup-time report: CASSAVA_STARTUP_REPORT=1 streamlit run app.py
+if os.environ.get('CASSAVA_STARTUP_REPORT'):
+    report = get_startup_report()
+    print(f"⏱️ Rerun startup: {(time.perf_counter() - _rerun_start) * 1000:.1f} ms before first content | "
+          f"schema v{report['schema_version']} (from v{report['migrated_from']}), "
+          f"bootstrap {report['bootstrap_ms']:.1f} ms once per process")
+
 # Check authentication
 if not is_authenticated():
     login_page()
@@ -52,7 +63,6 @@ if st.button("🚪 Logout", key="logout_minimal", help="Logout"):
     st.info("🔄 Mengalihkan ke halaman login...")
 
     # Add small delay for user to see the message
-    import time
     time.sleep(1.5)
 
     st.rerun()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Database Benchmark
+Benchmark performa database.py pada database sementara (tidak menyentuh cassava_users.db)
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# DB_FILE is relative to the working directory, so run everything inside a
+# temporary directory
+_workdir = tempfile.mkdtemp(prefix="cassava_bench_")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(_workdir)
+
+import database
+
+def use_database(name, schema_version=None):
+    """Point database.py at a fresh database file in the temp directory"""
+    database.analysis_writer.flush()
+    database.close_thread_connection()
+    database.DB_FILE = os.path.join(_workdir, name)
+    database.init_database(schema_version)
+
+def legacy_get_connection():
+    """Original behaviour: fresh connection per call, default rollback journal"""
+    conn = sqlite3.connect(database.DB_FILE)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def seed_history(num_users=50, rows_per_user=200):
+    """Insert users and analysis history rows"""
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    user_ids = []
+    for i in range(num_users):
+        cursor.execute('''
+            INSERT INTO users (email, username, password_hash, salt, role)
+            VALUES (?, ?, 'x', 'x', 'user')
+        ''', (f'user{i}@example.com', f'user{i}'))
+        user_ids.append(cursor.lastrowid)
+    conn.commit()
+    conn.close()
+
+    database.save_analyses([(user_id, f'img_{j}.jpg', 'Healthy', 0.9)
+                            for user_id in user_ids for j in range(rows_per_user)])
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+def run_concurrency(duration=3.0, num_readers=4):
+    """
+    One writer thread calls save_analysis in a loop while reader threads call
+    get_user_history; returns read latency stats and write throughput
+    """
+    stop = threading.Event()
+    read_latencies = []
+    read_errors = [0]
+    writes = [0]
+    lock = threading.Lock()
+
+    def writer():
+        while not stop.is_set():
+            if database.save_analysis(1, 'bench.jpg', 'Healthy', 0.99, 'bench', sync=True):
+                writes[0] += 1
+
+    def reader(user_id):
+        local = []
+        errors = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            rows = database.get_user_history(user_id, limit=20)
+            local.append((time.perf_counter() - start) * 1000)
+            if not rows:
+                errors += 1  # get_user_history returns [] when the read failed
+        with lock:
+            read_latencies.extend(local)
+            read_errors[0] += errors
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i + 2,)) for i in range(num_readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'reads': len(read_latencies),
+        'read_errors': read_errors[0],
+        'read_p50_ms': statistics.median(read_latencies) if read_latencies else 0.0,
+        'read_p99_ms': _percentile(read_latencies, 0.99),
+        'read_max_ms': max(read_latencies) if read_latencies else 0.0,
+        'writes_per_sec': writes[0] / duration
+    }
+
+def benchmark_connection_pool(duration=3.0):
+    """Compare legacy per-call connections with the pooled WAL connections"""
+    pooled_get_connection = database.get_connection
+    results = {}
+
+    for name, get_connection in (('legacy', legacy_get_connection), ('pooled_wal', pooled_get_connection)):
+        database.get_connection = get_connection
+        use_database(f'bench_{name}.db')
+        if name == 'legacy':
+            # Rollback journal explicitly, so the comparison is never WAL vs WAL
+            conn = legacy_get_connection()
+            journal_mode = conn.execute('PRAGMA journal_mode = DELETE').fetchone()[0]
+            conn.close()
+            assert journal_mode == 'delete', journal_mode
+        seed_history()
+        results[name] = run_concurrency(duration)
+
+    database.get_connection = pooled_get_connection
+
+    print(f"\n📊 Concurrent reads during writes ({duration:.0f}s, 1 writer + 4 readers):")
+    print(f"{'Mode':<12} {'Reads':>8} {'Errors':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'Writes/s':>9}")
+    for name, stats in results.items():
+        print(f"{name:<12} {stats['reads']:>8} {stats['read_errors']:>7} {stats['read_p50_ms']:>9.2f} "
+              f"{stats['read_p99_ms']:>9.2f} {stats['read_max_ms']:>9.2f} {stats['writes_per_sec']:>9.0f}")
+
+    return results
+
+DISEASES = ['Bacterial Blight', 'Brown Spot', 'Green Mite', 'Mosaic', 'Healthy']
+
+HISTORY_QUERIES = {
+    'user_history': ('''
+        SELECT * FROM analysis_history
+        WHERE user_id = ?
+        ORDER BY analysis_date DESC
+        LIMIT 10
+    ''', lambda: (4242,)),
+    'recent_activities': ('''
+        SELECT ah.id, u.username, u.email, ah.prediction, ah.confidence, ah.analysis_date, ah.image_filename
+        FROM analysis_history ah
+        JOIN users u ON ah.user_id = u.id
+        ORDER BY ah.analysis_date DESC
+        LIMIT 20
+    ''', lambda: ()),
+    'login_lookup': ('''
+        SELECT * FROM users WHERE username = ? OR email = ?
+    ''', lambda: ('user4242@example.com', 'user4242@example.com')),
+}
+
+def seed_large_history(num_rows=1_000_000, num_users=10_000, images_per_upload=4, batch_size=50_000):
+    """
+    Insert num_users users and num_rows rows into the flat (schema < 4)
+    analysis_history table, spread over one year in uploads of images_per_upload
+    """
+    conn = database.get_connection()
+    conn.executemany('''
+        INSERT INTO users (email, username, password_hash, salt, role)
+        VALUES (?, ?, 'x', 'x', 'user')
+    ''', [(f'user{i}@example.com', f'user{i}') for i in range(num_users)])
+
+    start_ts = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1))
+    for offset in range(0, num_rows, batch_size):
+        rows = []
+        for i in range(offset, min(offset + batch_size, num_rows)):
+            upload = i // images_per_upload
+            analysis_date = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(start_ts + (upload * 7919) % 31_536_000))
+            rows.append(((upload * 31) % num_users + 1, f'img_{i}.jpg', DISEASES[i % len(DISEASES)], 0.9, analysis_date))
+        conn.executemany('''
+            INSERT INTO analysis_history (user_id, image_filename, prediction, confidence, analysis_date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+    conn.commit()
+    conn.close()
+
+def _measure_queries(conn, repeats=20):
+    """Median latency and query plan for each HISTORY_QUERIES entry"""
+    results = {}
+    for name, (sql, params) in HISTORY_QUERIES.items():
+        plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params())]
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            conn.execute(sql, params()).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {'median_ms': statistics.median(timings), 'plan': plan}
+    return results
+
+def benchmark_indexes(num_rows=1_000_000):
+    """Query plans and latency before/after the index migration on a large history table"""
+    use_database('bench_indexes.db', schema_version=0)
+    conn = database.get_connection()
+
+    print(f"\n⏳ Seeding {num_rows:,} history rows...")
+    seed_large_history(num_rows)
+
+    before = _measure_queries(conn)
+    start = time.perf_counter()
+    version = database.migrate_database(conn, 1)
+    migrate_s = time.perf_counter() - start
+    after = _measure_queries(conn)
+
+    print(f"\n📊 Query latency with {num_rows:,} history rows (migration to v{version}: {migrate_s:.1f}s):")
+    print(f"{'Query':<18} {'Before (ms)':>12} {'After (ms)':>11} {'Speedup':>9}")
+    for name in HISTORY_QUERIES:
+        speedup = before[name]['median_ms'] / max(after[name]['median_ms'], 1e-6)
+        print(f"{name:<18} {before[name]['median_ms']:>12.2f} {after[name]['median_ms']:>11.3f} {speedup:>8.0f}x")
+
+    print("\n🔍 Query plans:")
+    for name in HISTORY_QUERIES:
+        print(f"  {name}")
+        print(f"    before: {'; '.join(before[name]['plan'])}")
+        print(f"    after : {'; '.join(after[name]['plan'])}")
+
+    conn.close()
+    return before, after
+
+def _timed(fn, repeats=10):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def benchmark_pagination(num_rows=200_000, page_size=20, depths=(0, 1_000, 10_000, 100_000, 190_000)):
+    """Per-page latency of OFFSET vs keyset pagination at increasing depths into the history"""
+    use_database('bench_pagination.db', schema_version=3)
+    seed_large_history(num_rows)
+    conn = database.get_connection()
+    database.migrate_database(conn)
+
+    offset_query = database.RECENT_ACTIVITIES_QUERY + \
+        ' ORDER BY s.created_at DESC, r.id DESC LIMIT ? OFFSET ?'
+
+    print(f"\n📊 Page latency over {num_rows:,} activities (page size {page_size}):")
+    print(f"{'Row offset':>11} {'OFFSET (ms)':>12} {'Keyset (ms)':>12}")
+    for depth in depths:
+        cursor = None
+        if depth:
+            last = conn.execute(offset_query, (1, depth - 1)).fetchone()
+            cursor = (last['analysis_date'], last['id'])
+
+        offset_rows = conn.execute(offset_query, (page_size, depth)).fetchall()
+        keyset_rows, _ = database.get_recent_activities_page(page_size, cursor)
+        assert [row['id'] for row in offset_rows] == [row['id'] for row in keyset_rows]
+
+        offset_ms = statistics.median(_timed(lambda: conn.execute(offset_query, (page_size, depth)).fetchall()))
+        keyset_ms = statistics.median(_timed(lambda: database.get_recent_activities_page(page_size, cursor)))
+        print(f"{depth:>11,} {offset_ms:>12.2f} {keyset_ms:>12.3f}")
+
+    start = time.perf_counter()
+    streamed = sum(1 for _ in database.iter_recent_activities(page_size=1000))
+    print(f"🔁 iter_recent_activities streamed {streamed:,} rows in {time.perf_counter() - start:.2f}s")
+
+    conn.close()
+
+def legacy_get_statistics(conn):
+    """Original get_statistics: four COUNT(*) scans per call"""
+    return {
+        'total_users': conn.execute('SELECT COUNT(*) FROM users').fetchone()[0],
+        'admin_count': conn.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'").fetchone()[0],
+        'user_count': conn.execute("SELECT COUNT(*) FROM users WHERE role = 'user'").fetchone()[0],
+        'total_classifications': conn.execute('SELECT COUNT(*) FROM analysis_history').fetchone()[0]
+    }
+
+def benchmark_statistics(num_rows=1_000_000):
+    """get_statistics latency with COUNT(*) scans vs trigger-maintained counters"""
+    use_database('bench_stats.db', schema_version=3)
+    start = time.perf_counter()
+    seed_large_history(num_rows)
+    seed_s = time.perf_counter() - start
+    conn = database.get_connection()
+
+    assert legacy_get_statistics(conn) == database.get_statistics()
+    legacy_ms = statistics.median(_timed(lambda: legacy_get_statistics(conn)))
+    counters_ms = statistics.median(_timed(database.get_statistics))
+    database.migrate_database(conn)
+    rebuild_s = statistics.median(_timed(database.rebuild_statistics, repeats=1)) / 1000
+
+    print(f"\n📊 get_statistics with {num_rows:,} history rows:")
+    print(f"   COUNT(*) scans : {legacy_ms:.2f} ms")
+    print(f"   stats_counters : {counters_ms:.3f} ms")
+    print(f"   rebuild_statistics: {rebuild_s:.2f}s, seeding with triggers: {seed_s:.1f}s")
+
+    conn.close()
+
+def benchmark_write_behind(num_uploads=20, images_per_upload=16):
+    """Caller-side save_analysis latency: synchronous commit per row vs the background writer"""
+    use_database('bench_write_behind.db')
+    seed_history(num_users=1, rows_per_user=0)
+
+    results = {}
+    for name, sync in (('sync', True), ('write_behind', False)):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(num_uploads):
+            upload_start = time.perf_counter()
+            for i in range(images_per_upload):
+                database.save_analysis(1, f'img_{i}.jpg', 'Healthy', 0.9, 'bench', sync=sync)
+            latencies.append((time.perf_counter() - upload_start) * 1000)
+        database.analysis_writer.flush()
+        results[name] = (statistics.median(latencies), time.perf_counter() - start)
+
+    stats = database.analysis_writer.stats()
+    print(f"\n📊 save_analysis per upload of {images_per_upload} images ({num_uploads} uploads):")
+    for name, (upload_ms, total_s) in results.items():
+        print(f"   {name:<13}: {upload_ms:8.2f} ms per upload (total incl. flush {total_s:.2f}s)")
+    print(f"   writer: {stats['batches']} batches, avg {stats['avg_rows_per_batch']:.1f} rows, "
+          f"avg flush {stats['avg_flush_ms']:.2f} ms, blocked puts {stats['blocked_puts']}")
+
+LEGACY_AGGREGATES = {
+    'user_disease_counts': ('''
+        SELECT prediction, COUNT(*) FROM analysis_history WHERE user_id = ? GROUP BY prediction
+    ''', (4242,)),
+    'disease_counts': ('''
+        SELECT prediction, COUNT(*) FROM analysis_history GROUP BY prediction
+    ''', ()),
+    'user_sessions': ('''
+        SELECT analysis_date, COUNT(*), AVG(confidence) FROM analysis_history
+        WHERE user_id = ? GROUP BY analysis_date ORDER BY analysis_date DESC LIMIT 10
+    ''', (4242,)),
+}
+
+NORMALIZED_AGGREGATES = {
+    'user_disease_counts': lambda conn: database.get_user_disease_counts(4242),
+    'disease_counts': lambda conn: conn.execute(
+        'SELECT disease_id, COUNT(*) FROM analysis_results GROUP BY disease_id').fetchall(),
+    'user_sessions': lambda conn: database.get_user_sessions_page(4242, 10),
+}
+
+def _database_size_mb(conn):
+    conn.execute('VACUUM')
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    return page_count * page_size / 1e6
+
+def benchmark_normalized_schema(num_rows=1_000_000):
+    """Aggregate latency and file size of the flat analysis_history vs sessions/results (migration 4)"""
+    use_database('bench_normalized.db', schema_version=3)
+    seed_large_history(num_rows)
+    conn = database.get_connection()
+    # Counters are not part of this comparison
+    for trigger in ('stats_history_insert', 'stats_history_delete', 'stats_history_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+    flat_size = _database_size_mb(conn)
+    flat = {name: statistics.median(_timed(lambda: conn.execute(sql, params).fetchall(), repeats=5))
+            for name, (sql, params) in LEGACY_AGGREGATES.items()}
+
+    start = time.perf_counter()
+    database.migrate_database(conn)
+    migrate_s = time.perf_counter() - start
+
+    normalized_size = _database_size_mb(conn)
+    normalized = {name: statistics.median(_timed(lambda: fn(conn), repeats=5))
+                  for name, fn in NORMALIZED_AGGREGATES.items()}
+
+    print(f"\n📊 Flat vs normalized history ({num_rows:,} results, migration 4: {migrate_s:.1f}s):")
+    print(f"{'Query':<20} {'Flat (ms)':>10} {'Normalized (ms)':>16}")
+    for name in LEGACY_AGGREGATES:
+        print(f"{name:<20} {flat[name]:>10.2f} {normalized[name]:>16.2f}")
+    print(f"{'file size (MB)':<20} {flat_size:>10.1f} {normalized_size:>16.1f}")
+
+    conn.close()
+
+def benchmark_user_cache(page_views=2000):
+    """get_user_profile + get_user_role per page view: uncached vs profile/role cache"""
+    use_database('bench_user_cache.db')
+    seed_history(num_users=50, rows_per_user=0)
+
+    def page_view(i, cached):
+        if not cached:
+            database.profile_cache.clear()
+            database.role_cache.clear()
+        user_id = i % 50 + 1
+        database.get_user_profile(user_id)
+        database.get_user_role(user_id)
+
+    results = {}
+    for name, cached in (('uncached', False), ('cached', True)):
+        # Fresh caches so the reported hit rate covers the cached run only
+        database.profile_cache = database.TTLCache(ttl=database.USER_CACHE_TTL)
+        database.role_cache = database.TTLCache(ttl=database.USER_CACHE_TTL)
+        start = time.perf_counter()
+        for i in range(page_views):
+            page_view(i, cached)
+        results[name] = (time.perf_counter() - start) / page_views * 1e6
+
+    stats = database.get_user_cache_stats()
+    print(f"\n📊 Profile + role lookup per page view ({page_views} views, 50 users):")
+    for name, us in results.items():
+        print(f"   {name:<9}: {us:7.1f} µs")
+    print(f"   hit rate: profile {stats['profile']['hit_rate']:.2f}, role {stats['role']['hit_rate']:.2f}")
+
+def benchmark_login_throughput(num_logins=64, concurrency=16):
+    """Concurrent login_user calls: PBKDF2 inline in the caller threads vs auth thread pool"""
+    use_database('bench_login.db')
+    for i in range(concurrency):
+        database.register_user(f'login{i}@example.com', f'login{i}', 'secret123')
+
+    def run(pool):
+        database.auth_pool.close()
+        database.auth_pool = pool
+        pool.warm_up()
+        counter = iter(range(num_logins))
+        lock = threading.Lock()
+        latencies = []
+
+        def worker(i):
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                start = time.perf_counter()
+                success = database.login_user(f'login{i}', 'secret123')[0]
+                elapsed = time.perf_counter() - start
+                assert success
+                with lock:
+                    latencies.append(elapsed)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return num_logins / (time.perf_counter() - start), _percentile(latencies, 0.95) * 1000
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    print(f"\n📊 Login throughput ({num_logins} logins, {concurrency} concurrent sessions, {cores} cores):")
+    print(f"   {'mode':<12} {'logins/s':>9} {'p95 (ms)':>9}")
+    rate, p95 = run(database.AuthPool(max_workers=0))
+    print(f"   {'inline':<12} {rate:>9.1f} {p95:>9.1f}")
+    for workers in worker_counts:
+        rate, p95 = run(database.AuthPool(max_workers=workers))
+        print(f"   {f'{workers} workers':<12} {rate:>9.1f} {p95:>9.1f}")
+    database.auth_pool.close()
+
+if __name__ == "__main__":
+    print("🧪 Database benchmark")
+    print(f"📂 Temporary directory: {_workdir}")
+    benchmark_connection_pool()
+    benchmark_write_behind()
+    benchmark_user_cache()
+    benchmark_login_throughput()
+    benchmark_indexes()
+    benchmark_pagination()
+    benchmark_statistics()
+    benchmark_normalized_schema()
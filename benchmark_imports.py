@@ -0,0 +1,117 @@
+# benchmark_imports.py - Benchmark waktu import & memori modul aplikasi
+"""
+Ukur waktu import (berdasarkan `python -X importtime`) dan RSS setiap modul
+aplikasi di proses Python baru, untuk mendeteksi regresi import berat
+(TensorFlow, matplotlib, pandas, skimage) di halaman non-ML.
+
+Jalankan:
+    python benchmark_imports.py
+    python benchmark_imports.py --budget-ms 500 --report import_report.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modul yang di-import halaman aplikasi (tanpa streamlit)
+MODULES = ['database', 'result_cache', 'disease_recommendations',
+           'cassava_leaf_characteristics', 'leaf_segmentation']
+
+HEAVY_PACKAGES = ('tensorflow', 'keras', 'matplotlib', 'pandas', 'skimage')
+
+# Dijalankan di proses baru: import modul, lalu cetak paket berat yang ikut ter-import dan RSS
+_PROBE = """
+import resource, sys
+import {module}
+heavy = sorted(p for p in {heavy!r} if p in sys.modules)
+print('RESULT', ','.join(heavy) or '-', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+def parse_importtime(stderr):
+    """
+    Parse output `-X importtime`: dict {nama_modul: (self_us, cumulative_us)}
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def _run_probe(module):
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module, heavy=HEAVY_PACKAGES)],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+
+def measure_import(module, top=5, startup_modules=()):
+    """
+    Import satu modul di interpreter baru dan kembalikan waktu, RSS dan import terberat
+    (tanpa modul yang sudah di-import saat interpreter start, `startup_modules`)
+    """
+    result = _run_probe(module)
+    if result.returncode != 0:
+        return {'module': module, 'error': result.stderr.strip().splitlines()[-1]}
+
+    timings = parse_importtime(result.stderr)
+    heavy, max_rss_kb = result.stdout.split('RESULT', 1)[1].split()
+    # Modul teratas: nama tanpa indentasi di output importtime
+    heaviest = sorted(((name, cumulative) for name, (_, cumulative) in timings.items()
+                       if name == name.lstrip() and name != module and name not in startup_modules),
+                      key=lambda item: item[1], reverse=True)[:top]
+
+    return {
+        'module': module,
+        'import_ms': timings.get(module, (0, 0))[1] / 1000,
+        'max_rss_mb': int(max_rss_kb) / 1024,
+        'heavy_packages': [package for package in heavy.split(',') if package != '-'],
+        'heaviest_imports': [{'name': name, 'ms': us / 1000} for name, us in heaviest]
+    }
+
+def benchmark_imports(modules=MODULES, budget_ms=None, report_path=None):
+    """
+    Tabel waktu import & RSS per modul; kembalikan daftar modul yang melebihi budget_ms
+    """
+    startup_modules = set(parse_importtime(_run_probe('sys').stderr))
+    results = [measure_import(module, startup_modules=startup_modules) for module in modules]
+
+    print("\n📊 Import per modul (interpreter baru, `-X importtime`):")
+    print(f"{'Modul':<30} {'Import (ms)':>12} {'RSS (MB)':>9}  Paket berat")
+    over_budget = []
+    for result in results:
+        if 'error' in result:
+            print(f"{result['module']:<30} {'error':>12}  {result['error']}")
+            continue
+        heavy = ', '.join(result['heavy_packages']) or '-'
+        print(f"{result['module']:<30} {result['import_ms']:>12.1f} {result['max_rss_mb']:>9.1f}  {heavy}")
+        if budget_ms is not None and result['import_ms'] > budget_ms:
+            over_budget.append(result['module'])
+
+    for result in results:
+        if result.get('heaviest_imports'):
+            imports = ', '.join(f"{item['name']} {item['ms']:.0f} ms" for item in result['heaviest_imports'])
+            print(f"   {result['module']}: {imports}")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump({'budget_ms': budget_ms, 'modules': results}, f, indent=2)
+        print(f"💾 Report disimpan: {report_path}")
+
+    if over_budget:
+        print(f"❌ Melebihi budget {budget_ms:.0f} ms: {', '.join(over_budget)}")
+    return over_budget
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark waktu import modul aplikasi")
+    parser.add_argument('modules', nargs='*', default=MODULES, help="Modul yang diukur")
+    parser.add_argument('--budget-ms', type=float, help="Gagal (exit 1) jika import melebihi budget")
+    parser.add_argument('--report', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    print("🧪 Benchmark import")
+    sys.exit(1 if benchmark_imports(args.modules, args.budget_ms, args.report) else 0)
@@ -0,0 +1,128 @@
+# benchmark_input_pipeline.py - Benchmark pipeline input binary classifier
+"""
+Bandingkan throughput (gambar/detik) ImageDataGenerator.flow_from_directory
+(implementasi lama) dengan pipeline tf.data di binary_classifier_data.py.
+
+Tanpa --data-dir, dataset JPEG sintetis dibuat di folder sementara.
+
+Jalankan:
+    python benchmark_input_pipeline.py
+    python benchmark_input_pipeline.py --data-dir dataset/binary_classification --epochs 3
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+import tensorflow as tf
+
+import binary_classifier_data as data
+
+def make_synthetic_dataset(root, images_per_class=200, size=(640, 480), seed=0):
+    """
+    Dataset JPEG sintetis dengan struktur {train,val}/{cassava,non_cassava}
+    Gambar cassava dominan hijau sehingga kedua kelas bisa dipisahkan (AUC bermakna)
+    """
+    rng = np.random.default_rng(seed)
+    channel_scale = {'cassava': (0.5, 1.0, 0.4), 'non_cassava': (1.0, 0.7, 0.6)}
+    for split in ['train', 'val']:
+        for category in ['cassava', 'non_cassava']:
+            folder = os.path.join(root, split, category)
+            os.makedirs(folder, exist_ok=True)
+            for i in range(images_per_class):
+                base = rng.integers(0, 256, size=(size[1] // 16, size[0] // 16, 3)) * channel_scale[category]
+                image = Image.fromarray(base.astype(np.uint8)).resize(size, Image.Resampling.BILINEAR)
+                image.save(os.path.join(folder, f"{category}_{i:04d}.jpg"), quality=90)
+    return root
+
+def legacy_train_generator(data_dir):
+    """
+    Implementasi lama (create_binary_data_generators) sebagai pembanding
+    """
+    train_datagen = tf.keras.preprocessing.image.ImageDataGenerator(
+        rescale=1./255,
+        rotation_range=20,
+        width_shift_range=0.2,
+        height_shift_range=0.2,
+        shear_range=0.15,
+        zoom_range=0.15,
+        horizontal_flip=True,
+        fill_mode='nearest',
+        validation_split=0.2
+    )
+    return train_datagen.flow_from_directory(
+        os.path.join(data_dir, 'train'),
+        target_size=data.IMG_SIZE,
+        batch_size=data.BATCH_SIZE,
+        class_mode='binary',
+        subset='training',
+        shuffle=True
+    )
+
+def _epoch_images_per_sec(batches):
+    """
+    Iterasi satu epoch penuh, kembalikan gambar/detik
+    """
+    start = time.perf_counter()
+    count = 0
+    for images, _ in batches:
+        count += len(images)
+    return count / (time.perf_counter() - start)
+
+def benchmark_input_pipeline(data_dir, epochs=3):
+    """
+    Gambar/detik per epoch: generator lama vs tf.data (epoch 1 decode + tulis cache, berikutnya dari cache)
+    """
+    results = {}
+
+    generator = legacy_train_generator(data_dir)
+    rates = []
+    for _ in range(epochs):
+        generator.on_epoch_end()
+        rates.append(_epoch_images_per_sec(generator[i] for i in range(len(generator))))
+    results['ImageDataGenerator'] = rates
+
+    cache_dir = tempfile.mkdtemp(prefix="cassava_tfdata_cache_")
+    try:
+        paths, labels, _ = data.list_image_files(os.path.join(data_dir, 'train'), 'training')
+        for name, cache_file in (('tf.data (file cache)', data._cache_file(cache_dir, 'train', paths)),
+                                 ('tf.data (no cache)', '')):
+            dataset = data.build_dataset(paths, labels, training=True, cache_file=cache_file)
+            results[name] = [_epoch_images_per_sec(dataset) for _ in range(epochs)]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"\n📊 Throughput training input ({len(paths)} gambar, batch {data.BATCH_SIZE}, "
+          f"{os.cpu_count()} core):")
+    header = ''.join(f"{f'epoch {i + 1}':>10}" for i in range(epochs))
+    print(f"{'Pipeline':<22}{header}   (gambar/detik)")
+    for name, rates in results.items():
+        print(f"{name:<22}" + ''.join(f"{rate:>10.1f}" for rate in rates))
+
+    baseline = np.mean(results['ImageDataGenerator'])
+    speedup = np.mean(results['tf.data (file cache)'][1:] or results['tf.data (file cache)']) / baseline
+    print(f"⚡ tf.data (cache) vs ImageDataGenerator: {speedup:.1f}x")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline input binary classifier")
+    parser.add_argument('--data-dir', help="Folder {train,val}/{cassava,non_cassava} (default: sintetis)")
+    parser.add_argument('--images-per-class', type=int, default=200, help="Ukuran dataset sintetis")
+    parser.add_argument('--epochs', type=int, default=3)
+    args = parser.parse_args()
+
+    print("🧪 Benchmark pipeline input")
+    if args.data_dir:
+        benchmark_input_pipeline(args.data_dir, args.epochs)
+    else:
+        workdir = tempfile.mkdtemp(prefix="cassava_dataset_")
+        try:
+            print(f"📂 Dataset sintetis: {workdir}")
+            make_synthetic_dataset(workdir, args.images_per_class)
+            benchmark_input_pipeline(workdir, args.epochs)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,132 @@
+# benchmark_segmentation.py - Benchmark untuk LeafDetector (color thresholding)
+"""
+Benchmark performa segmentasi berbasis warna pada LeafDetector.
+
+Jalankan:
+    python benchmark_segmentation.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from leaf_segmentation import LeafDetector
+
+def _time_call(fn, repeats=5):
+    """
+    Waktu rata-rata (ms) untuk satu panggilan fn()
+    """
+    fn()  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def make_noisy_mask(num_components, size=(2048, 2048), seed=0):
+    """
+    Mask sintetis berisi `num_components` blob terpisah (mirip patch rumput/tanah)
+    Separuh blob lebih besar dari min_area sehingga ikut dipertahankan filter
+    """
+    rng = np.random.default_rng(seed)
+    mask = np.zeros(size, dtype=np.uint8)
+    cell = 34  # Jarak antar blob agar tidak saling menyatu
+    rows, cols = size[0] // cell, size[1] // cell
+    cells = rng.choice(rows * cols, size=min(num_components, rows * cols), replace=False)
+
+    for i, index in enumerate(cells):
+        y, x = divmod(int(index), cols)
+        radius = 15 if i % 2 == 0 else 8  # ~700 px (dipertahankan) vs ~200 px (noise)
+        cv2.circle(mask, (x * cell + cell // 2, y * cell + cell // 2), radius, 255, -1)
+
+    return mask
+
+def filter_components_loop(mask, min_area=500):
+    """
+    Implementasi lama (loop Python per label) sebagai pembanding
+    """
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    filtered_mask = np.zeros_like(mask)
+
+    for i in range(1, num_labels):
+        if stats[i, cv2.CC_STAT_AREA] > min_area:
+            filtered_mask[labels == i] = 255
+
+    return filtered_mask
+
+def benchmark_component_filtering(component_counts=(10, 100, 500, 1000, 3000)):
+    """
+    Bandingkan loop per label vs lookup table untuk jumlah komponen yang bertambah
+    """
+    detector = LeafDetector()
+
+    print("\n📊 Filtering komponen terhubung (mask 2048x2048):")
+    print(f"{'Komponen':>10} {'Label':>8} {'Loop (ms)':>11} {'LUT (ms)':>10} {'Speedup':>9}")
+
+    for count in component_counts:
+        mask = make_noisy_mask(count)
+        num_labels = cv2.connectedComponents(mask, connectivity=8)[0]
+
+        # Pastikan hasil identik sebelum membandingkan waktu
+        assert np.array_equal(filter_components_loop(mask), detector.filter_small_components(mask))
+
+        loop_ms = _time_call(lambda: filter_components_loop(mask))
+        lut_ms = _time_call(lambda: detector.filter_small_components(mask))
+        print(f"{count:>10} {num_labels:>8} {loop_ms:>11.2f} {lut_ms:>10.2f} {loop_ms / lut_ms:>8.1f}x")
+
+def make_field_photo(size=(3024, 4032), seed=0):
+    """
+    Foto sintetis ukuran kamera HP (12 MP): daun hijau di atas latar tanah bernoise
+    """
+    rng = np.random.default_rng(seed)
+    height, width = size
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = (120, 90, 60)  # Tanah coklat
+    image = cv2.add(image, rng.integers(0, 40, size=image.shape, dtype=np.uint8))
+
+    # Daun: elips hijau dengan beberapa cuping
+    center = (width // 2, height // 2)
+    for angle in range(0, 360, 60):
+        cv2.ellipse(image, center, (width // 6, height // 14), angle, 0, 360, (50, 140, 50), -1)
+
+    return image
+
+def _bounding_box(mask):
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        return None
+    return int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())
+
+def benchmark_working_resolution(working_sizes=(None, 2048, 1024, 512)):
+    """
+    Bandingkan segmentasi resolusi penuh vs downscale-first untuk foto 12 MP
+    Akurasi diukur dengan IoU mask dan selisih bounding box daun terhadap resolusi penuh
+    """
+    image = make_field_photo()
+    reference_mask = LeafDetector(working_size=None).detect_leaf_color_threshold(image)
+    reference_box = _bounding_box(reference_mask)
+
+    print(f"\n📊 Resolusi kerja (foto {image.shape[1]}x{image.shape[0]}):")
+    print(f"{'Working size':>13} {'Mask (ms)':>10} {'Crop (ms)':>10} {'IoU':>7} {'Box diff (px)':>14}")
+
+    for working_size in working_sizes:
+        detector = LeafDetector(working_size=working_size)
+        mask = detector.detect_leaf_color_threshold(image)
+
+        mask_ms = _time_call(lambda: detector.detect_leaf_color_threshold(image), repeats=3)
+        crop_ms = _time_call(lambda: detector.extract_largest_green_region(image, mask), repeats=3)
+
+        intersection = np.logical_and(mask > 0, reference_mask > 0).sum()
+        union = np.logical_or(mask > 0, reference_mask > 0).sum()
+        iou = intersection / union if union > 0 else 1.0
+
+        box = _bounding_box(mask)
+        box_diff = max(abs(a - b) for a, b in zip(box, reference_box)) if box and reference_box else -1
+
+        label = working_size or 'full'
+        print(f"{label:>13} {mask_ms:>10.1f} {crop_ms:>10.1f} {iou:>7.4f} {box_diff:>14}")
+
+if __name__ == "__main__":
+    print("🧪 Benchmark segmentasi daun (color thresholding)")
+    benchmark_component_filtering()
+    benchmark_working_resolution()
@@ -0,0 +1,162 @@
+# benchmark_texture.py - Benchmark & validasi GLCM terkuantisasi
+"""
+Bandingkan GLCM 256 level (scikit-image) dengan compute_glcm_features
+(NumPy/OpenCV, level tereduksi) dari sisi waktu dan keputusan classify_leaf_type.
+
+Jalankan:
+    python benchmark_texture.py
+    python benchmark_texture.py --image-dir dataset/binary_classification/val --report glcm_report.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from cassava_leaf_characteristics import CassavaLeafAnalyzer, compute_glcm_features, feature
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def _time_call(fn, repeats=3):
+    """
+    Waktu rata-rata (ms) untuk satu panggilan fn()
+    """
+    fn()  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def make_texture_images(count=40, size=(480, 640), seed=0):
+    """
+    Gambar sintetis dengan tingkat kekasaran tekstur bervariasi
+    (dipakai jika tidak ada folder gambar)
+    """
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        base = np.empty(size + (3,), dtype=np.uint8)
+        base[:] = (int(rng.integers(20, 120)), int(rng.integers(80, 200)), int(rng.integers(20, 120)))
+        noise = rng.normal(0, rng.uniform(1, 60), size + (3,))
+        image = np.clip(base + noise, 0, 255).astype(np.uint8)
+        blur = int(rng.choice([1, 3, 5, 7]))
+        image = cv2.GaussianBlur(image, (blur, blur), 0)
+
+        center = (size[1] // 2, size[0] // 2)
+        for angle in range(0, 360, int(rng.choice([45, 60, 90]))):
+            cv2.ellipse(image, center, (size[1] // 5, size[0] // 12), angle, 0, 360,
+                        (50, 140, 50), int(rng.choice([-1, 3])))
+        images.append(image)
+    return images
+
+def load_images(image_dir, limit=200):
+    """
+    Muat gambar RGB dari folder (rekursif)
+    """
+    images = []
+    for root, _, files in os.walk(image_dir):
+        for filename in sorted(files):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(np.array(Image.open(os.path.join(root, filename)).convert('RGB')))
+                if len(images) >= limit:
+                    return images
+    return images
+
+def benchmark_glcm_speed(sizes=((768, 1024), (3024, 4032)), levels=(256, 64, 32)):
+    """
+    Waktu GLCM per gambar: scikit-image 256 level vs compute_glcm_features dengan level tereduksi
+    """
+    rng = np.random.default_rng(0)
+
+    print("\n📊 Waktu GLCM per gambar (ms):")
+    header = f"{'Ukuran':>11} {'skimage-256':>12}" + ''.join(f" {'numpy-' + str(level):>10}" for level in levels)
+    print(header)
+
+    for height, width in sizes:
+        gray = cv2.GaussianBlur((rng.random((height, width)) * 255).astype(np.uint8), (5, 5), 0)
+
+        if feature is not None:
+            angles = [0, np.pi/4, np.pi/2, 3*np.pi/4]
+            skimage_ms = _time_call(lambda: [
+                feature.graycoprops(glcm, prop).mean()
+                for glcm in [feature.graycomatrix(gray, [1], angles, levels=256, symmetric=True, normed=True)]
+                for prop in ('contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation')
+            ])
+            row = f"{f'{width}x{height}':>11} {skimage_ms:>12.1f}"
+        else:
+            row = f"{f'{width}x{height}':>11} {'n/a':>12}"
+
+        for level in levels:
+            row += f" {_time_call(lambda: compute_glcm_features(gray, level)):>10.1f}"
+        print(row)
+
+def validate_glcm_decisions(images, configs=((64, None), (32, None), (64, 512)), report_path=None):
+    """
+    Bandingkan keputusan classify_leaf_type (dan nilai contrast) antara GLCM
+    256 level dengan setiap konfigurasi (levels, max_size)
+    """
+    reference = CassavaLeafAnalyzer(glcm_levels=256)
+    reference_results = []
+    start = time.perf_counter()
+    for image in images:
+        features = reference.extract_features(image)
+        reference_results.append((reference.classify_leaf_type(*features), features.texture['texture_roughness']))
+    reference_ms = (time.perf_counter() - start) / max(len(images), 1) * 1000
+
+    num_cassava = sum(result['predicted_type'] == 'cassava' for result, _ in reference_results)
+    report = {'num_images': len(images), 'reference_cassava': num_cassava,
+              'reference_ms_per_image': reference_ms, 'configs': {}}
+
+    print(f"\n📋 Validasi keputusan classify_leaf_type ({len(images)} gambar, referensi: 256 level, "
+          f"{num_cassava} cassava):")
+    print(f"{'Konfigurasi':>16} {'Sama':>6} {'Agreement':>10} {'Contrast rel. err':>18} {'ms/gambar':>10}")
+    print(f"{'L256 (ref)':>16} {len(images):>6} {1.0:>10.3f} {0.0:>18.4f} {reference_ms:>10.1f}")
+
+    for levels, max_size in configs:
+        analyzer = CassavaLeafAnalyzer(glcm_levels=levels, glcm_max_size=max_size)
+        same = 0
+        relative_errors = []
+
+        start = time.perf_counter()
+        for image, (ref_classification, ref_contrast) in zip(images, reference_results):
+            features = analyzer.extract_features(image)
+            classification = analyzer.classify_leaf_type(*features)
+            same += classification['predicted_type'] == ref_classification['predicted_type']
+            relative_errors.append(abs(features.texture['texture_roughness'] - ref_contrast) / max(ref_contrast, 1e-9))
+        elapsed_ms = (time.perf_counter() - start) / max(len(images), 1) * 1000
+
+        name = f"L{levels}" + (f"/max{max_size}" if max_size else "")
+        agreement = same / max(len(images), 1)
+        report['configs'][name] = {
+            'levels': levels,
+            'max_size': max_size,
+            'same_decisions': same,
+            'agreement': agreement,
+            'mean_contrast_relative_error': float(np.mean(relative_errors)),
+            'ms_per_image': elapsed_ms
+        }
+        print(f"{name:>16} {same:>6} {agreement:>10.3f} {np.mean(relative_errors):>18.4f} {elapsed_ms:>10.1f}")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report disimpan: {report_path}")
+
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark & validasi GLCM terkuantisasi")
+    parser.add_argument('--image-dir', help="Folder gambar untuk validasi (default: gambar sintetis)")
+    parser.add_argument('--limit', type=int, default=200, help="Jumlah maksimum gambar")
+    parser.add_argument('--report', help="Simpan report validasi ke file JSON")
+    args = parser.parse_args()
+
+    print("🧪 Benchmark GLCM")
+    benchmark_glcm_speed()
+
+    images = load_images(args.image_dir, args.limit) if args.image_dir else make_texture_images()
+    validate_glcm_decisions(images, report_path=args.report)
@@ -0,0 +1,157 @@
+# benchmark_training_precision.py - Bandingkan setup training binary classifier (fp32/bf16, XLA)
+"""
+Training binary classifier (create_binary_vgg_model + pipeline tf.data) untuk
+setiap konfigurasi presisi, masing-masing di proses baru agar peak memory
+terukur terpisah:
+
+- fp32       : float32, tanpa XLA (default lama)
+- fp32+xla   : float32, jit_compile=True
+- bf16       : mixed_bfloat16 (jika CPU mendukung)
+- bf16+xla   : mixed_bfloat16 + jit_compile=True
+
+Report: waktu epoch pertama (termasuk decode & kompilasi), rata-rata epoch
+berikutnya, peak RSS, dan AUC validasi akhir.
+
+Jalankan:
+    python benchmark_training_precision.py
+    python benchmark_training_precision.py --data-dir dataset/binary_classification --epochs 3 --report precision_report.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+CONFIGS = {
+    'fp32': {'mixed_precision': False, 'jit_compile': False},
+    'fp32+xla': {'mixed_precision': False, 'jit_compile': True},
+    'bf16': {'mixed_precision': True, 'jit_compile': False},
+    'bf16+xla': {'mixed_precision': True, 'jit_compile': True},
+}
+
+# Selisih AUC yang masih dianggap "akurasi sama" saat memilih setup tercepat
+AUC_TOLERANCE = 0.005
+
+def run_config(config, data_dir, epochs, weights, batch_size):
+    """
+    Training satu konfigurasi di proses ini; kembalikan dict hasil
+    """
+    import tensorflow as tf
+    from binary_classifier_data import create_binary_datasets
+    from binary_classifier_model import compile_binary_model, create_binary_vgg_model, set_precision_policy
+
+    settings = CONFIGS[config]
+    policy = set_precision_policy(settings['mixed_precision'])
+    # Cache decode di memori: setiap konfigurasi membayar decode yang sama di epoch pertama
+    train_ds, val_ds = create_binary_datasets(data_dir, batch_size, cache_dir=None)
+    model = compile_binary_model(create_binary_vgg_model(weights), jit_compile=settings['jit_compile'])
+
+    epoch_seconds = []
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self._start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            epoch_seconds.append(time.perf_counter() - self._start)
+
+    history = model.fit(train_ds, epochs=epochs, validation_data=val_ds, callbacks=[EpochTimer()], verbose=0)
+    steady = epoch_seconds[1:] or epoch_seconds
+
+    return {
+        'config': config,
+        'policy': policy,
+        'jit_compile': settings['jit_compile'],
+        'epoch_seconds': epoch_seconds,
+        'first_epoch_s': epoch_seconds[0],
+        'steady_epoch_s': sum(steady) / len(steady),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'val_auc': float(history.history['val_auc'][-1]),
+        'val_accuracy': float(history.history['val_accuracy'][-1])
+    }
+
+def _run_in_subprocess(config, args):
+    command = [sys.executable, os.path.abspath(__file__), '--run-config', config,
+               '--data-dir', args.data_dir, '--epochs', str(args.epochs),
+               '--weights', args.weights, '--batch-size', str(args.batch_size)]
+    result = subprocess.run(command, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in result.stdout.splitlines():
+        if line.startswith('RESULT '):
+            return json.loads(line[len('RESULT '):])
+    return {'config': config, 'error': (result.stderr.strip().splitlines() or ['unknown error'])[-1]}
+
+def benchmark_training_precision(args, configs=tuple(CONFIGS)):
+    """
+    Tabel perbandingan semua konfigurasi + rekomendasi setup tercepat dengan AUC setara
+    """
+    results = [_run_in_subprocess(config, args) for config in configs]
+
+    print(f"\n📊 Training binary classifier ({args.epochs} epoch, batch {args.batch_size}, "
+          f"weights={args.weights}, {os.cpu_count()} core):")
+    print(f"{'Setup':<10} {'Policy':<15} {'Epoch 1 (s)':>11} {'Epoch (s)':>10} {'Peak RSS (MB)':>14} {'Val AUC':>8}")
+    completed = []
+    for result in results:
+        if 'error' in result:
+            print(f"{result['config']:<10} error: {result['error']}")
+            continue
+        completed.append(result)
+        print(f"{result['config']:<10} {result['policy']:<15} {result['first_epoch_s']:>11.1f} "
+              f"{result['steady_epoch_s']:>10.1f} {result['peak_rss_mb']:>14.0f} {result['val_auc']:>8.4f}")
+
+    recommended = None
+    if completed:
+        best_auc = max(result['val_auc'] for result in completed)
+        candidates = [result for result in completed if result['val_auc'] >= best_auc - AUC_TOLERANCE]
+        recommended = min(candidates, key=lambda result: result['steady_epoch_s'])['config']
+        baseline = next((r for r in completed if r['config'] == 'fp32'), None)
+        speedup = ''
+        if baseline:
+            chosen = next(r for r in completed if r['config'] == recommended)
+            speedup = f" ({baseline['steady_epoch_s'] / chosen['steady_epoch_s']:.2f}x vs fp32)"
+        print(f"⚡ Rekomendasi: {recommended}{speedup}, AUC dalam {AUC_TOLERANCE} dari terbaik")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'epochs': args.epochs, 'batch_size': args.batch_size, 'weights': args.weights,
+                       'auc_tolerance': AUC_TOLERANCE, 'recommended': recommended, 'results': results}, f, indent=2)
+        print(f"💾 Report disimpan: {args.report}")
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan fp32 / mixed_bfloat16 / XLA untuk training")
+    parser.add_argument('--data-dir', help="Folder {train,val}/{cassava,non_cassava} (default: sintetis)")
+    parser.add_argument('--images-per-class', type=int, default=100, help="Ukuran dataset sintetis")
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--weights', default='imagenet', choices=['imagenet', 'none'],
+                        help="Bobot awal VGG16 ('none' jika offline)")
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument('--report', help="Simpan hasil ke file JSON")
+    parser.add_argument('--run-config', choices=list(CONFIGS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        weights = None if args.weights == 'none' else args.weights
+        result = run_config(args.run_config, args.data_dir, args.epochs, weights, args.batch_size)
+        print('RESULT ' + json.dumps(result))
+        sys.exit(0)
+
+    print("🧪 Benchmark presisi training")
+    workdir = None
+    if not args.data_dir:
+        from benchmark_input_pipeline import make_synthetic_dataset
+        workdir = tempfile.mkdtemp(prefix="cassava_dataset_")
+        print(f"📂 Dataset sintetis: {workdir}")
+        args.data_dir = make_synthetic_dataset(workdir, args.images_per_class, size=(320, 240))
+    try:
+        benchmark_training_precision(args, args.configs)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,196 @@
+# binary_classifier_data.py - Pipeline input tf.data untuk binary classifier (cassava vs non-cassava)
+"""
+Pengganti ImageDataGenerator.flow_from_directory untuk training
+binary_classifier_cnn.ipynb:
+
+- decode & resize paralel (num_parallel_calls=AUTOTUNE)
+- hasil decode (uint8 224x224) di-cache ke file lokal, epoch berikutnya tidak decode ulang
+- augmentasi per batch dengan satu transformasi affine (rotasi, shift, shear, zoom, flip)
+- prefetch agar CPU menyiapkan batch berikutnya selama model training
+
+Struktur folder dan pembagian subset sama dengan flow_from_directory:
+    dataset/binary_classification/{train,val}/{cassava,non_cassava}/*.jpg
+"""
+
+import hashlib
+import json
+import math
+import os
+
+import tensorflow as tf
+
+IMG_SIZE = (224, 224)
+BATCH_SIZE = 32
+VALIDATION_SPLIT = 0.2
+SHUFFLE_BUFFER = 1000
+DATA_DIR = "dataset/binary_classification"
+CACHE_DIR = "cache/binary_classifier"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Kebijakan augmentasi yang sama dengan ImageDataGenerator lama (fill_mode='nearest')
+AUGMENTATION = {
+    'rotation_range': 20,        # derajat
+    'width_shift_range': 0.2,    # fraksi lebar
+    'height_shift_range': 0.2,   # fraksi tinggi
+    'shear_range': 0.15,         # derajat
+    'zoom_range': 0.15,
+    'horizontal_flip': True
+}
+
+def list_image_files(directory, subset=None, validation_split=VALIDATION_SPLIT):
+    """
+    Daftar (paths, labels, class_names) dengan urutan & subset sama seperti flow_from_directory:
+    kelas = subfolder terurut, label = indeks kelas; subset 'validation' mengambil
+    `validation_split` pertama tiap kelas, 'training' sisanya
+    """
+    class_names = sorted(name for name in os.listdir(directory)
+                         if os.path.isdir(os.path.join(directory, name)))
+    paths, labels = [], []
+
+    for label, class_name in enumerate(class_names):
+        class_paths = []
+        for root, _, files in sorted(os.walk(os.path.join(directory, class_name))):
+            for filename in sorted(files):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    class_paths.append(os.path.join(root, filename))
+
+        if subset == 'validation':
+            class_paths = class_paths[:int(validation_split * len(class_paths))]
+        elif subset == 'training':
+            class_paths = class_paths[int(validation_split * len(class_paths)):]
+
+        paths.extend(class_paths)
+        labels.extend([label] * len(class_paths))
+
+    return paths, labels, class_names
+
+def load_image(path, label):
+    """
+    Baca, decode, dan resize satu gambar ke uint8 (interpolasi nearest, sama dengan flow_from_directory)
+    """
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    image = tf.image.resize(image, IMG_SIZE, method='nearest')
+    return tf.cast(image, tf.uint8), tf.cast(label, tf.float32)
+
+def random_affine_transforms(batch_size, height, width, policy=AUGMENTATION, seed=None):
+    """
+    Matriks transformasi (batch_size, 8) untuk ImageProjectiveTransformV3 yang memetakan
+    koordinat output ke input: flip -> zoom -> shear -> shift -> rotasi, di sekitar pusat gambar
+    Parameter acak per gambar dengan distribusi yang sama seperti ImageDataGenerator;
+    dengan `seed` (pasangan int) hasilnya deterministik (stateless RNG)
+    """
+    draws = iter(range(8))
+
+    def uniform(limit, minval=None):
+        minval = -limit if minval is None else minval
+        if seed is None:
+            return tf.random.uniform([batch_size], minval, limit)
+        # Seed berbeda untuk setiap parameter transformasi
+        stream = tf.stack([tf.cast(seed[0], tf.int64), tf.cast(seed[1], tf.int64) * 8 + next(draws)])
+        return tf.random.stateless_uniform([batch_size], stream, minval, limit)
+
+    theta = uniform(policy['rotation_range']) * (math.pi / 180)
+    shear = uniform(policy['shear_range']) * (math.pi / 180)
+    zoom_x = 1.0 + uniform(policy['zoom_range'])
+    zoom_y = 1.0 + uniform(policy['zoom_range'])
+    shift_x = uniform(policy['width_shift_range']) * width
+    shift_y = uniform(policy['height_shift_range']) * height
+    flip = tf.ones([batch_size])
+    if policy['horizontal_flip']:
+        flip = tf.where(uniform(1.0, minval=0.0) < 0.5, -1.0, 1.0)
+
+    cos, sin = tf.cos(theta), tf.sin(theta)
+    a0 = cos * zoom_x * flip
+    a1 = -(cos * tf.sin(shear) + sin * tf.cos(shear)) * zoom_y
+    a3 = sin * zoom_x * flip
+    a4 = (cos * tf.cos(shear) - sin * tf.sin(shear)) * zoom_y
+
+    center_x, center_y = (width - 1) / 2, (height - 1) / 2
+    a2 = center_x + cos * shift_x - sin * shift_y - (a0 * center_x + a1 * center_y)
+    a5 = center_y + sin * shift_x + cos * shift_y - (a3 * center_x + a4 * center_y)
+
+    zeros = tf.zeros([batch_size])
+    return tf.stack([a0, a1, a2, a3, a4, a5, zeros, zeros], axis=1)
+
+def augment_batch(images, policy=AUGMENTATION, seed=None):
+    """
+    Augmentasi satu batch float32 (N, H, W, 3) dengan satu operasi affine ter-vektorisasi
+    """
+    shape = tf.shape(images)
+    transforms = random_affine_transforms(shape[0], tf.cast(shape[1], tf.float32),
+                                          tf.cast(shape[2], tf.float32), policy, seed)
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=images, transforms=transforms, output_shape=shape[1:3], fill_value=0.0,
+        interpolation='BILINEAR', fill_mode='NEAREST'
+    )
+
+def write_json_atomic(path, data, indent=2):
+    """
+    Tulis JSON ke file sementara lalu rename, aman jika proses dihentikan di tengah penulisan
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+    return path
+
+def _cache_file(cache_dir, name, paths):
+    """
+    Nama file cache dari daftar file (path, ukuran, mtime) dan IMG_SIZE,
+    sehingga cache otomatis dibuat ulang ketika dataset berubah
+    """
+    digest = hashlib.sha1(repr(IMG_SIZE).encode('utf-8'))
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{int(stat.st_mtime)}\n".encode('utf-8'))
+    return os.path.join(cache_dir, f"{name}_{digest.hexdigest()[:16]}")
+
+def build_dataset(paths, labels, training, batch_size=BATCH_SIZE, cache_file=None, augment=True):
+    """
+    tf.data.Dataset (images float32 [0, 1], labels float32) dari daftar file
+    cache_file None = cache di memori, '' = tanpa cache
+    """
+    dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+    dataset = dataset.map(load_image, num_parallel_calls=tf.data.AUTOTUNE)
+
+    if cache_file is None:
+        dataset = dataset.cache()
+    elif cache_file:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        dataset = dataset.cache(cache_file)
+
+    if training:
+        dataset = dataset.shuffle(min(len(paths), SHUFFLE_BUFFER), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+
+    def prepare(images, batch_labels):
+        images = tf.cast(images, tf.float32) / 255.0
+        if training and augment:
+            images = augment_batch(images)
+        return images, batch_labels
+
+    dataset = dataset.map(prepare, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+def create_binary_datasets(data_dir=DATA_DIR, batch_size=BATCH_SIZE, cache_dir=CACHE_DIR):
+    """
+    Dataset training & validasi untuk binary classifier
+    Subset sama dengan generator lama: 'training' dari train/, 'validation' dari val/
+    Validasi tidak diaugmentasi
+    """
+    train_paths, train_labels, class_names = list_image_files(os.path.join(data_dir, 'train'), 'training')
+    val_paths, val_labels, _ = list_image_files(os.path.join(data_dir, 'val'), 'validation')
+
+    print(f"Found {len(train_paths)} training images and {len(val_paths)} validation images "
+          f"belonging to {len(class_names)} classes: {class_names}")
+
+    def cache_file(name, paths):
+        return _cache_file(cache_dir, name, paths) if cache_dir else None
+
+    train_ds = build_dataset(train_paths, train_labels, training=True, batch_size=batch_size,
+                             cache_file=cache_file('train', train_paths))
+    val_ds = build_dataset(val_paths, val_labels, training=False, batch_size=batch_size,
+                           cache_file=cache_file('val', val_paths))
+    return train_ds, val_ds
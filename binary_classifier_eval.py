@@ -0,0 +1,127 @@
+# binary_classifier_eval.py - Evaluasi streaming binary classifier (cassava vs non-cassava)
+"""
+Evaluasi per batch tanpa menyimpan semua prediksi di memori:
+confusion matrix, AUC (tf.keras.metrics.AUC, histogram threshold) dan
+counter per kelas diperbarui setiap batch. Memori konstan terhadap ukuran
+dataset; batch berikutnya disiapkan tf.data (prefetch) selama model
+memproses batch saat ini.
+
+Label mengikuti urutan folder: 0 = cassava, 1 = non_cassava. Output sigmoid
+model adalah probabilitas kelas 1, jadi "positif" = non-cassava.
+"""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from binary_classifier_data import write_json_atomic
+
+CLASS_NAMES = ('Cassava', 'Non-Cassava')
+METRICS_PATH = "model/metrics.json"
+
+class StreamingBinaryEvaluator:
+    """
+    Akumulator metrik binary classification yang diperbarui per batch
+    """
+
+    def __init__(self, class_names=CLASS_NAMES, threshold=0.5, num_thresholds=200):
+        self.class_names = list(class_names)
+        self.threshold = threshold
+        self.confusion = np.zeros((2, 2), dtype=np.int64)  # baris = label, kolom = prediksi
+        self.auc = tf.keras.metrics.AUC(num_thresholds=num_thresholds)
+        self.loss = tf.keras.metrics.BinaryCrossentropy()
+        self.num_batches = 0
+
+    def update(self, labels, probabilities):
+        """
+        Tambahkan satu batch: labels (N,) 0/1, probabilities (N,) atau (N, 1)
+        """
+        labels = np.asarray(labels).reshape(-1).astype(np.int64)
+        probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+        predictions = (probabilities > self.threshold).astype(np.int64)
+
+        # Confusion matrix 2x2 dalam satu bincount
+        self.confusion += np.bincount(labels * 2 + predictions, minlength=4).reshape(2, 2)
+        self.auc.update_state(labels, probabilities)
+        self.loss.update_state(labels, probabilities)
+        self.num_batches += 1
+
+    def result(self):
+        """
+        Dict metrik (JSON-serializable): confusion matrix, accuracy, precision/recall/F1
+        untuk kelas positif, AUC, loss, dan report per kelas
+        """
+        tn, fp, fn, tp = (int(value) for value in self.confusion.ravel())
+        total = tn + fp + fn + tp
+
+        def safe_div(a, b):
+            return a / b if b else 0.0
+
+        def f1(precision, recall):
+            return safe_div(2 * precision * recall, precision + recall)
+
+        per_class = {}
+        for index, name in enumerate(self.class_names):
+            true_positive = int(self.confusion[index, index])
+            predicted = int(self.confusion[:, index].sum())
+            support = int(self.confusion[index, :].sum())
+            precision = safe_div(true_positive, predicted)
+            recall = safe_div(true_positive, support)
+            per_class[name] = {'precision': precision, 'recall': recall,
+                               'f1': f1(precision, recall), 'support': support}
+
+        precision = safe_div(tp, tp + fp)
+        recall = safe_div(tp, tp + fn)
+        return {
+            'num_samples': total,
+            'threshold': self.threshold,
+            'accuracy': safe_div(tp + tn, total),
+            'precision': precision,
+            'recall': recall,
+            'f1': f1(precision, recall),
+            'auc': float(self.auc.result()),
+            'loss': float(self.loss.result()) if total else 0.0,
+            'confusion_matrix': self.confusion.tolist(),
+            'class_names': self.class_names,
+            'per_class': per_class,
+            'macro_f1': float(np.mean([stats['f1'] for stats in per_class.values()]))
+        }
+
+def evaluate_streaming(model, dataset, evaluator=None):
+    """
+    Evaluasi model pada tf.data.Dataset (images, labels) batch per batch
+    Kembalikan dict metrik dari StreamingBinaryEvaluator
+    """
+    evaluator = evaluator or StreamingBinaryEvaluator()
+
+    @tf.function(reduce_retracing=True)
+    def predict_step(images):
+        return tf.cast(model(images, training=False), tf.float32)
+
+    start = time.perf_counter()
+    for images, labels in dataset:
+        evaluator.update(labels.numpy(), predict_step(images).numpy())
+
+    metrics = evaluator.result()
+    metrics['eval_seconds'] = time.perf_counter() - start
+    return metrics
+
+def format_classification_report(metrics):
+    """
+    Report per kelas dalam format tabel (seperti sklearn classification_report)
+    """
+    lines = [f"{'':<14}{'precision':>10}{'recall':>10}{'f1-score':>10}{'support':>10}", ""]
+    for name, stats in metrics['per_class'].items():
+        lines.append(f"{name:<14}{stats['precision']:>10.4f}{stats['recall']:>10.4f}"
+                     f"{stats['f1']:>10.4f}{stats['support']:>10d}")
+    lines.append("")
+    lines.append(f"{'accuracy':<14}{'':>10}{'':>10}{metrics['accuracy']:>10.4f}{metrics['num_samples']:>10d}")
+    lines.append(f"{'macro avg f1':<14}{'':>10}{'':>10}{metrics['macro_f1']:>10.4f}{metrics['num_samples']:>10d}")
+    return '\n'.join(lines)
+
+def save_metrics(metrics, path=METRICS_PATH):
+    """
+    Simpan metrik ke JSON (ditulis ke file sementara lalu di-rename)
+    """
+    return write_json_atomic(path, metrics)
@@ -0,0 +1,160 @@
+# binary_classifier_model.py - Arsitektur & konfigurasi training binary classifier VGG16
+"""
+Model binary classifier (cassava vs non-cassava) yang dipakai
+binary_classifier_cnn.ipynb dan benchmark training:
+
+- create_binary_vgg_model : VGG16 beku + head Dropout/Dense (layout model/binary_classifier.h5)
+- create_binary_head      : head yang sama di atas fitur pooled (training bottleneck)
+- set_precision_policy    : mixed_bfloat16 jika CPU mendukung, selain itu float32
+- compile_binary_model    : optimizer/loss/metric, opsional jit_compile (XLA)
+- create_callbacks        : checkpoint terbaik, early stopping, jadwal learning rate
+
+Dengan mixed precision, output sigmoid dan loss tetap float32. bfloat16 punya
+rentang eksponen yang sama dengan float32, jadi tidak perlu loss scaling
+(Keras hanya memakai LossScaleOptimizer untuk mixed_float16).
+"""
+
+import tensorflow as tf
+from tensorflow.keras.applications import VGG16
+from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
+from tensorflow.keras.models import Model
+
+from binary_classifier_data import IMG_SIZE
+
+LEARNING_RATE = 0.001
+MIXED_PRECISION_POLICY = 'mixed_bfloat16'
+
+# Flag /proc/cpuinfo untuk instruksi bfloat16 native (AVX512-BF16 / AMX)
+BFLOAT16_CPU_FLAGS = ('avx512_bf16', 'amx_bf16')
+
+def cpu_supports_bfloat16():
+    """
+    Cek apakah CPU punya instruksi bfloat16 native (Linux, via /proc/cpuinfo)
+    Tanpa instruksi ini bfloat16 diemulasi dan justru lebih lambat dari float32
+    """
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = set(f.read().split())
+    except OSError:
+        return False
+    return any(flag in flags for flag in BFLOAT16_CPU_FLAGS)
+
+def set_precision_policy(mixed_precision=False):
+    """
+    Set global dtype policy Keras; kembalikan nama policy yang aktif
+    Harus dipanggil sebelum model dibuat
+    """
+    policy = 'float32'
+    if mixed_precision:
+        if cpu_supports_bfloat16():
+            policy = MIXED_PRECISION_POLICY
+        else:
+            print("⚠️ CPU tidak mendukung bfloat16, training tetap float32")
+
+    tf.keras.mixed_precision.set_global_policy(policy)
+    return policy
+
+def create_binary_vgg_model(weights='imagenet'):
+    """Create VGG16-based binary classification model"""
+
+    print("🏗️ Creating binary VGG16 model...")
+
+    # Base model VGG16
+    base_model = VGG16(
+        weights=weights,
+        include_top=False,
+        input_shape=(IMG_SIZE[0], IMG_SIZE[1], 3)
+    )
+
+    # Freeze base model
+    base_model.trainable = False
+
+    # Custom head for binary classification
+    inputs = tf.keras.Input(shape=(IMG_SIZE[0], IMG_SIZE[1], 3))
+    x = base_model(inputs, training=False)
+    x = GlobalAveragePooling2D()(x)
+    x = Dropout(0.3)(x)
+    x = Dense(256, activation='relu')(x)
+    x = Dropout(0.5)(x)
+    outputs = Dense(1, activation='sigmoid', dtype='float32')(x)  # Binary classification, fp32 output
+
+    model = Model(inputs, outputs)
+
+    return model
+
+def create_binary_head(feature_dim=512):
+    """Create the classification head alone, on pooled VGG16 features (same layers as above)"""
+
+    inputs = tf.keras.Input(shape=(feature_dim,))
+    x = Dropout(0.3)(inputs)
+    x = Dense(256, activation='relu')(x)
+    x = Dropout(0.5)(x)
+    outputs = Dense(1, activation='sigmoid', dtype='float32')(x)
+
+    return Model(inputs, outputs)
+
+def assemble_binary_model(model, head):
+    """Copy trained head weights into the full VGG16 model (layout of model/binary_classifier.h5)"""
+
+    model_dense = [layer for layer in model.layers if isinstance(layer, Dense)]
+    head_dense = [layer for layer in head.layers if isinstance(layer, Dense)]
+    for target, source in zip(model_dense, head_dense):
+        target.set_weights(source.get_weights())
+
+    return model
+
+def compile_binary_model(model, learning_rate=LEARNING_RATE, jit_compile=False):
+    """Compile with the binary classification optimizer, loss and metrics"""
+
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss='binary_crossentropy',
+        metrics=['accuracy', tf.keras.metrics.AUC(name='auc')],
+        jit_compile=jit_compile
+    )
+
+    return model
+
+def create_callbacks(checkpoint_filepath, save_weights_only=False, early_stopping_patience=8, lr_patience=3):
+    """Checkpoint on best val_accuracy, early stopping and LR schedule on val_loss"""
+
+    return [
+        ModelCheckpoint(
+            checkpoint_filepath,
+            monitor='val_accuracy',
+            save_best_only=True,
+            save_weights_only=save_weights_only,
+            mode='max',
+            verbose=1
+        ),
+        EarlyStopping(
+            monitor='val_loss',
+            patience=early_stopping_patience,
+            restore_best_weights=True,
+            verbose=1
+        ),
+        ReduceLROnPlateau(
+            monitor='val_loss',
+            factor=0.3,
+            patience=lr_patience,
+            min_lr=0.00001,
+            verbose=1
+        )
+    ]
+
+def to_float32_model(model, learning_rate=LEARNING_RATE):
+    """
+    Salinan float32 dari model yang di-training dengan mixed precision
+    Variabel mixed precision sudah float32, hanya policy layer yang berubah, sehingga
+    file .h5 tetap dimuat sebagai model float32 di aplikasi
+    """
+    previous_policy = tf.keras.mixed_precision.global_policy()
+    tf.keras.mixed_precision.set_global_policy('float32')
+    try:
+        float32_model = create_binary_vgg_model(weights=None)
+    finally:
+        tf.keras.mixed_precision.set_global_policy(previous_policy)
+
+    float32_model.set_weights(model.get_weights())
+    return compile_binary_model(float32_model, learning_rate)
@@ -0,0 +1,141 @@
+# bottleneck_features.py - Cache fitur VGG16 (bottleneck) untuk training head binary classifier
+"""
+Base VGG16 di binary classifier dibekukan, jadi output-nya (setelah
+GlobalAveragePooling2D) hanya bergantung pada gambar dan augmentasinya.
+Modul ini menghitung fitur tersebut SEKALI per (gambar, seed augmentasi)
+dan menyimpannya ke file .npy yang dibaca lewat memory-map, sehingga
+training head (Dropout/Dense) tidak lagi menjalankan VGG16 setiap epoch.
+
+Layout feature store (per split):
+    <name>_<digest>.npy        float32 (variants, N, 512), dibuka dengan mmap_mode='r'
+    <name>_<digest>.json       metadata: label, variant yang sudah selesai (untuk resume)
+
+Dengan num_augmentations=0 hanya ada satu variant tanpa augmentasi (untuk
+validasi); selain itu variant v memakai augment_batch dengan seed
+deterministik (v + 1, indeks batch).
+"""
+
+import json
+import math
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from binary_classifier_data import BATCH_SIZE, _cache_file, augment_batch, build_dataset, write_json_atomic
+
+FEATURE_DIR = "cache/binary_classifier/features"
+NUM_AUGMENTATIONS = 5
+
+def build_feature_extractor(base_model):
+    """
+    Model gambar -> fitur pooled (GlobalAveragePooling2D dari output base VGG16)
+    """
+    outputs = tf.keras.layers.GlobalAveragePooling2D()(base_model.output)
+    return tf.keras.Model(base_model.input, outputs)
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def extract_features(extractor, paths, labels, name, num_augmentations=NUM_AUGMENTATIONS,
+                     feature_dir=FEATURE_DIR, batch_size=BATCH_SIZE):
+    """
+    Hitung (atau lanjutkan) feature store untuk satu split dan kembalikan path .npy
+    Variant yang sudah selesai di run sebelumnya tidak dihitung ulang
+    """
+    num_variants = max(1, num_augmentations)
+    feature_dim = int(extractor.output_shape[-1])
+    # Fitur dari extractor mixed precision (bfloat16) disimpan terpisah dari float32
+    dtype_suffix = '' if extractor.compute_dtype == 'float32' else f"_{extractor.compute_dtype}"
+    base_path = _cache_file(feature_dir, f"{name}_aug{num_augmentations}{dtype_suffix}", paths)
+    features_path, meta_path = base_path + '.npy', base_path + '.json'
+    os.makedirs(feature_dir, exist_ok=True)
+
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(features_path):
+        meta = {'num_images': len(paths), 'num_variants': num_variants, 'feature_dim': feature_dim,
+                'num_augmentations': num_augmentations, 'labels': [int(label) for label in labels],
+                'completed_variants': []}
+        store = np.lib.format.open_memmap(features_path, mode='w+', dtype=np.float32,
+                                          shape=(num_variants, len(paths), feature_dim))
+        del store
+        write_json_atomic(meta_path, meta, indent=None)
+
+    pending = [v for v in range(num_variants) if v not in meta['completed_variants']]
+    if not pending:
+        print(f"✅ Feature store {name}: {features_path} (cache)")
+        return features_path
+
+    # Gambar ter-decode dari cache tf.data, urutan tetap (tanpa shuffle & augmentasi)
+    images = build_dataset(paths, labels, training=False, batch_size=batch_size,
+                           cache_file=_cache_file(os.path.dirname(feature_dir), name, paths))
+
+    @tf.function
+    def features_for(batch, variant, batch_index):
+        if num_augmentations:
+            batch = augment_batch(batch, seed=tf.stack([variant, batch_index]))
+        return extractor(batch, training=False)
+
+    store = np.load(features_path, mmap_mode='r+')
+    for variant in pending:
+        start = time.perf_counter()
+        offset = 0
+        for batch_index, (batch, _) in enumerate(images):
+            batch_features = features_for(batch, tf.constant(variant + 1, tf.int64),
+                                          tf.constant(batch_index, tf.int64)).numpy()
+            store[variant, offset:offset + len(batch_features)] = batch_features
+            offset += len(batch_features)
+        store.flush()
+
+        meta['completed_variants'].append(variant)
+        write_json_atomic(meta_path, meta, indent=None)
+        print(f"💾 Fitur {name} variant {variant + 1}/{num_variants}: {len(paths)} gambar "
+              f"({time.perf_counter() - start:.1f}s)")
+
+    del store
+    return features_path
+
+def load_feature_store(features_path):
+    """
+    (features memmap (variants, N, D), labels float32) dari feature store
+    """
+    meta = _read_meta(os.path.splitext(features_path)[0] + '.json')
+    features = np.load(features_path, mmap_mode='r')
+    return features, np.asarray(meta['labels'], dtype=np.float32)
+
+class FeatureSequence(tf.keras.utils.Sequence):
+    """
+    Batch fitur dari feature store untuk model.fit: epoch e memakai variant e % variants
+    (augmentasi berbeda tiap epoch, berulang setelah semua variant terpakai)
+    """
+
+    def __init__(self, features, labels, batch_size=BATCH_SIZE, shuffle=True, seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.features = features
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.epoch = 0
+        self._rng = np.random.default_rng(seed)
+        self._order = np.arange(len(labels))
+        if shuffle:
+            self._rng.shuffle(self._order)
+
+    def __len__(self):
+        return math.ceil(len(self.labels) / self.batch_size)
+
+    def __getitem__(self, index):
+        # Indeks terurut agar pembacaan memmap berurutan di disk
+        batch = np.sort(self._order[index * self.batch_size:(index + 1) * self.batch_size])
+        variant = self.epoch % self.features.shape[0]
+        return np.asarray(self.features[variant, batch]), self.labels[batch]
+
+    def on_epoch_end(self):
+        self.epoch += 1
+        if self.shuffle:
+            self._rng.shuffle(self._order)
@@ -9,21 +9,96 @@ Berdasarkan studi botani dan computer vision analysis.
 import numpy as np
 import cv2
 from PIL import Image
-import matplotlib.pyplot as plt
-try:
-    from skimage import feature, filters
-except ImportError:
+from typing import NamedTuple, Optional
+
+from lazy_imports import lazy_import
+
+# Dependency berat di-import saat pertama dipakai (GLCM 256 level, tabel)
+pd = lazy_import('pandas')
+feature = lazy_import('skimage.feature', optional=True)
+if feature is None:
     print("⚠️ scikit-image tidak tersedia, menggunakan fallback methods")
-    feature = None
-    filters = None
-import pandas as pd
+
+class LeafFeatures(NamedTuple):
+    """
+    Hasil ekstraksi fitur gabungan dari CassavaLeafAnalyzer.extract_features
+    """
+    morphology: Optional[dict]  # None jika tidak ada kontur
+    color: dict
+    texture: dict
+
+# Offset (dy, dx) untuk sudut GLCM 0, pi/4, pi/2, 3pi/4 dengan jarak 1
+# (konvensi sama dengan skimage.feature.graycomatrix)
+GLCM_OFFSETS = [(0, 1), (1, 1), (1, 0), (1, -1)]
+
+def compute_glcm_features(gray, levels=64, max_size=None):
+    """
+    Fitur GLCM terkuantisasi (simetris, ternormalisasi, rata-rata 4 sudut) dengan NumPy/OpenCV
+    Contrast & dissimilarity diskalakan ke satuan 256 level (threshold classify_leaf_type tetap)
+    max_size: opsional, perkecil gambar dulu
+    """
+    if max_size and max(gray.shape) > max_size:
+        scale = max_size / max(gray.shape)
+        gray = cv2.resize(gray, (max(1, int(gray.shape[1] * scale)), max(1, int(gray.shape[0] * scale))),
+                          interpolation=cv2.INTER_AREA)
+
+    # Kuantisasi via LUT: indeks pasangan = high + low (muat di uint16)
+    level_lut = (np.arange(256) * levels // 256).astype(np.uint16)
+    low = cv2.LUT(gray, level_lut)
+    high = cv2.LUT(gray, level_lut * levels)
+    height, width = gray.shape
+    num_bins = levels * levels
+
+    glcm = np.zeros((levels, levels, len(GLCM_OFFSETS)), dtype=np.float64)
+    for k, (dy, dx) in enumerate(GLCM_OFFSETS):
+        first = high[max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)]
+        second = low[max(0, dy):height - max(0, -dy), max(0, dx):width - max(0, -dx)]
+        pair_index = cv2.add(first, second)
+        counts = cv2.calcHist([pair_index], [0], None, [num_bins], [0, num_bins])
+        counts = counts.astype(np.float64).reshape(levels, levels)
+        counts = counts + counts.T  # simetris
+        total = counts.sum()
+        if total > 0:
+            glcm[:, :, k] = counts / total
+
+    i, j = np.ogrid[:levels, :levels]
+    i, j = i[..., np.newaxis], j[..., np.newaxis]
+    diff = (i - j).astype(np.float64)
+
+    contrast = (glcm * diff ** 2).sum(axis=(0, 1))
+    dissimilarity = (glcm * np.abs(diff)).sum(axis=(0, 1))
+    homogeneity = (glcm / (1.0 + diff ** 2)).sum(axis=(0, 1))
+    energy = np.sqrt((glcm ** 2).sum(axis=(0, 1)))
+
+    mean_i = (glcm * i).sum(axis=(0, 1))
+    mean_j = (glcm * j).sum(axis=(0, 1))
+    std_i = np.sqrt((glcm * (i - mean_i) ** 2).sum(axis=(0, 1)))
+    std_j = np.sqrt((glcm * (j - mean_j) ** 2).sum(axis=(0, 1)))
+    covariance = (glcm * (i - mean_i) * (j - mean_j)).sum(axis=(0, 1))
+    flat = (std_i < 1e-15) | (std_j < 1e-15)
+    correlation = np.where(flat, 1.0, covariance / np.where(flat, 1.0, std_i * std_j))
+
+    # Skala ke satuan 256 level; kuantisasi menambah contrast ~(w^2 - 1) / 6
+    level_width = 256 / levels
+    return {
+        'contrast': max(contrast.mean() * level_width ** 2 - (level_width ** 2 - 1) / 6, 0.0),
+        'dissimilarity': dissimilarity.mean() * level_width,
+        'homogeneity': homogeneity.mean(),
+        'energy': energy.mean(),
+        'correlation': correlation.mean()
+    }
 
 class CassavaLeafAnalyzer:
     """
     Analyzer untuk mengidentifikasi karakteristik unik daun singkong
     """
 
-    def __init__(self):
+    def __init__(self, glcm_levels=256, glcm_max_size=None):
+        # GLCM: default 256 level (scikit-image); 64/32 level (compute_glcm_features,
+        # lebih cepat) opt-in sampai divalidasi di dataset asli (benchmark_texture.py)
+        self.glcm_levels = glcm_levels
+        self.glcm_max_size = glcm_max_size
+
         # Karakteristik morfologi daun singkong
         self.cassava_characteristics = {
             'shape': {
@@ -77,22 +152,57 @@ class CassavaLeafAnalyzer:
             ]
         }
 
-    def analyze_leaf_morphology(self, image):
+    @staticmethod
+    def _to_array(image):
         """
-        Analisis morfologi daun menggunakan computer vision
+        Konversi input (PIL Image atau numpy array) ke numpy array RGB
         """
-        # Convert to numpy array
         if isinstance(image, Image.Image):
-            img_array = np.array(image)
-        else:
-            img_array = image
+            return np.array(image)
+        return image
 
-        # Convert to grayscale for analysis
+    def extract_features(self, image):
+        """
+        Ekstraksi fitur morfologi, warna, dan tekstur dalam satu pass
+        Intermediate yang dipakai bersama (array, grayscale, HSV, Canny)
+        hanya dihitung sekali
+        """
+        img_array = self._to_array(image)
         gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-
-        # Edge detection
+        hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
         edges = cv2.Canny(gray, 100, 200)
 
+        return LeafFeatures(
+            morphology=self._morphology_features(edges),
+            color=self._color_features(img_array, hsv),
+            texture=self._texture_features(gray, edges)
+        )
+
+    def analyze_leaf_morphology(self, image):
+        """
+        Analisis morfologi daun menggunakan computer vision
+        """
+        gray = cv2.cvtColor(self._to_array(image), cv2.COLOR_RGB2GRAY)
+        return self._morphology_features(cv2.Canny(gray, 100, 200))
+
+    def analyze_leaf_color(self, image):
+        """
+        Analisis karakteristik warna daun
+        """
+        img_array = self._to_array(image)
+        return self._color_features(img_array, cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV))
+
+    def analyze_leaf_texture(self, image):
+        """
+        Analisis tekstur daun menggunakan GLCM dan filter banks
+        """
+        gray = cv2.cvtColor(self._to_array(image), cv2.COLOR_RGB2GRAY)
+        return self._texture_features(gray, cv2.Canny(gray, 100, 200))
+
+    def _morphology_features(self, edges):
+        """
+        Fitur morfologi dari edge map (Canny)
+        """
         # Contour detection
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
@@ -136,27 +246,19 @@ class CassavaLeafAnalyzer:
 
         return morphology_features
 
-    def analyze_leaf_color(self, image):
+    def _color_features(self, img_array, hsv):
         """
-        Analisis karakteristik warna daun
+        Fitur warna dari array RGB dan HSV
         """
-        if isinstance(image, Image.Image):
-            img_array = np.array(image)
-        else:
-            img_array = image
-
-        # Convert to HSV for better color analysis
-        hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
-
-        # Calculate color statistics
-        h_mean, h_std = np.mean(hsv[:, :, 0]), np.std(hsv[:, :, 0])
-        s_mean, s_std = np.mean(hsv[:, :, 1]), np.std(hsv[:, :, 1])
-        v_mean, v_std = np.mean(hsv[:, :, 2]), np.std(hsv[:, :, 2])
+        # Calculate color statistics (per channel mean/std in one pass)
+        hsv_mean, hsv_std = cv2.meanStdDev(hsv)
+        h_mean, s_mean, v_mean = hsv_mean.ravel()
+        h_std, s_std, v_std = hsv_std.ravel()
 
         # RGB statistics
-        r_mean, r_std = np.mean(img_array[:, :, 0]), np.std(img_array[:, :, 0])
-        g_mean, g_std = np.mean(img_array[:, :, 1]), np.std(img_array[:, :, 1])
-        b_mean, b_std = np.mean(img_array[:, :, 2]), np.std(img_array[:, :, 2])
+        rgb_mean, rgb_std = cv2.meanStdDev(img_array)
+        r_mean, g_mean, b_mean = rgb_mean.ravel()
+        r_std, g_std, b_std = rgb_std.ravel()
 
         # Color classification
         if 80 < h_mean < 140:  # Green hue range
@@ -185,41 +287,32 @@ class CassavaLeafAnalyzer:
 
         return color_features
 
-    def analyze_leaf_texture(self, image):
+    def _texture_features(self, gray, edges):
         """
-        Analisis tekstur daun menggunakan GLCM dan filter banks
+        Fitur tekstur dari grayscale dan edge map (Canny)
         """
-        if isinstance(image, Image.Image):
-            img_array = np.array(image)
-        else:
-            img_array = image
+        glcm_features = None
 
-        # Convert to grayscale
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-
-        # Try GLCM features if scikit-image is available
-        if feature is not None:
+        # Full 256-level GLCM via scikit-image if available
+        if self.glcm_levels == 256 and self.glcm_max_size is None and feature is not None:
             try:
-                # GLCM (Gray Level Co-occurrence Matrix) features
                 glcm = feature.graycomatrix(gray, [1], [0, np.pi/4, np.pi/2, 3*np.pi/4],
                                            levels=256, symmetric=True, normed=True)
 
                 # Texture features from GLCM
-                contrast = feature.graycoprops(glcm, 'contrast').mean()
-                dissimilarity = feature.graycoprops(glcm, 'dissimilarity').mean()
-                homogeneity = feature.graycoprops(glcm, 'homogeneity').mean()
-                energy = feature.graycoprops(glcm, 'energy').mean()
-                correlation = feature.graycoprops(glcm, 'correlation').mean()
+                glcm_features = {
+                    prop: feature.graycoprops(glcm, prop).mean()
+                    for prop in ('contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation')
+                }
             except Exception as e:
-                print(f"⚠️ GLCM analysis failed: {e}, using fallback")
-                contrast = dissimilarity = homogeneity = energy = correlation = 0.5
-        else:
-            # Fallback values if scikit-image not available
-            contrast = dissimilarity = homogeneity = energy = correlation = 0.5
+                print(f"⚠️ GLCM analysis failed: {e}, using quantized GLCM")
+
+        # Quantized GLCM (also used when scikit-image is not available)
+        if glcm_features is None:
+            glcm_features = compute_glcm_features(gray, self.glcm_levels, self.glcm_max_size)
 
         # Edge density (roughness measure) - always available
-        edges = cv2.Canny(gray, 100, 200)
-        edge_density = np.sum(edges > 0) / edges.size
+        edge_density = cv2.countNonZero(edges) / edges.size
 
         # Local variance (texture complexity) - using OpenCV
         # Create a simple local variance measure
@@ -229,17 +322,11 @@ class CassavaLeafAnalyzer:
         texture_complexity = np.std(local_var)
 
         texture_features = {
-            'glcm_features': {
-                'contrast': contrast,
-                'dissimilarity': dissimilarity,
-                'homogeneity': homogeneity,
-                'energy': energy,
-                'correlation': correlation
-            },
+            'glcm_features': glcm_features,
             'edge_density': edge_density,
             'texture_complexity': texture_complexity,
-            'surface_smoothness': homogeneity,  # Higher = smoother
-            'texture_roughness': contrast  # Higher = rougher
+            'surface_smoothness': glcm_features['homogeneity'],  # Higher = smoother
+            'texture_roughness': glcm_features['contrast']  # Higher = rougher
         }
 
         return texture_features
@@ -469,10 +556,8 @@ def analyze_image_and_identify(image_path):
         # Load image
         image = Image.open(image_path).convert('RGB')
 
-        # Analyze features
-        morphology = analyzer.analyze_leaf_morphology(image)
-        color = analyzer.analyze_leaf_color(image)
-        texture = analyzer.analyze_leaf_texture(image)
+        # Analyze features (single pass)
+        morphology, color, texture = analyzer.extract_features(image)
 
         # Classify
         classification = analyzer.classify_leaf_type(morphology, color, texture)
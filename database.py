@@ -1,21 +1,87 @@
 # database.py
 import sqlite3
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 import hashlib
+import hmac
 import secrets
+import threading
+import queue
+import time
+import atexit
+import json
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 DB_FILE = "cassava_users.db"
 
-def get_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_FILE)
+# Pragmas applied to every pooled connection
+BUSY_TIMEOUT_MS = 5000
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',          # readers no longer block behind writers
+    'PRAGMA synchronous = NORMAL',        # safe with WAL, one fsync per checkpoint
+    'PRAGMA cache_size = -16000',         # 16 MB page cache
+    'PRAGMA mmap_size = 268435456',       # 256 MB memory-mapped I/O
+    'PRAGMA temp_store = MEMORY',
+    f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}',
+)
+
+_pool = threading.local()
+
+def _open_connection(db_file):
+    """Open a new tuned connection"""
+    conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
-def init_database():
-    """Initialize database with tables"""
-    conn = get_connection()
+def _open_bootstrap_connection(db_file):
+    """
+    Connection for schema bootstrap only: leaves the journal mode untouched,
+    so init_database does not switch a database to WAL by itself
+    """
+    conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+class PooledConnection:
+    """Per-thread cached connection; close() returns it to the pool instead of closing it"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        # Discard anything the caller did not commit, keep the connection open
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+def get_connection():
+    """Get pooled database connection (one cached connection per thread)"""
+    conn = getattr(_pool, 'connection', None)
+    if conn is None or _pool.db_file != DB_FILE:
+        ensure_database()
+        conn = _open_connection(DB_FILE)
+        _pool.connection = conn
+        _pool.db_file = DB_FILE
+    elif conn.in_transaction:
+        # Leftover from a caller that failed before commit/close
+        conn.rollback()
+    return PooledConnection(conn)
+
+def close_thread_connection():
+    """Close the current thread's pooled connection"""
+    conn = getattr(_pool, 'connection', None)
+    if conn is not None:
+        conn.close()
+        _pool.connection = None
+
+def _create_base_tables(conn):
+    """Create the schema-version-0 tables"""
     cursor = conn.cursor()
     
     # Users table
@@ -59,35 +125,489 @@ def init_database():
     ''')
     
     conn.commit()
-    conn.close()
 
-def hash_password(password):
-    """Hash password with salt"""
+_bootstrapped = set()
+_bootstrap_lock = threading.Lock()
+_startup_reports = {}
+
+def _bootstrap(db_file, target_version=None):
+    """Create base tables and apply pending migrations (called with _bootstrap_lock held)"""
+    start = time.perf_counter()
+    target_version = SCHEMA_VERSION if target_version is None else target_version
+
+    conn = _open_bootstrap_connection(db_file)
+    try:
+        version = get_schema_version(conn)
+        if version == 0:
+            _create_base_tables(conn)
+        if version < target_version:
+            migrate_database(conn, target_version)
+    finally:
+        conn.close()
+
+    _bootstrapped.add(db_file)
+    _startup_reports[db_file] = {
+        'db_file': db_file,
+        'migrated_from': version,
+        'schema_version': max(version, target_version),
+        'bootstrap_ms': (time.perf_counter() - start) * 1000
+    }
+
+def init_database(target_version=None):
+    """Initialize database with tables and migrate it to target_version (default: latest)"""
+    with _bootstrap_lock:
+        _bootstrap(DB_FILE, target_version)
+
+def ensure_database():
+    """
+    One-time, process-level schema bootstrap of DB_FILE.
+    After the first call (or init_database) it returns without opening a
+    connection, so Streamlit reruns and page switches do no DDL.
+    """
+    db_file = DB_FILE
+    if db_file in _bootstrapped:
+        return
+    with _bootstrap_lock:
+        if db_file not in _bootstrapped:
+            _bootstrap(db_file)
+
+def get_startup_report():
+    """Bootstrap timing of DB_FILE in this process (None before the first connection)"""
+    report = _startup_reports.get(DB_FILE)
+    return dict(report) if report else None
+
+def _bump_counter(scope, key, delta):
+    """Trigger statement that adds delta to one stats_counters row"""
+    return f'''
+            INSERT INTO stats_counters (scope, key, value) VALUES ({scope}, {key}, {delta})
+            ON CONFLICT (scope, key) DO UPDATE SET value = value + ({delta});'''
+
+# stats_counters scopes: users/total, role/<role>, classifications/total,
+# disease/<prediction>, day/<YYYY-MM-DD>
+# STATS_TRIGGERS/STATS_REBUILD belong to migration 2 (flat analysis_history);
+# from migration 4 on, RESULTS_STATS_* maintain the same counters.
+STATS_TRIGGERS = [
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_users_insert AFTER INSERT ON users BEGIN
+            {_bump_counter("'users'", "'total'", 1)}
+            {_bump_counter("'role'", "NEW.role", 1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_users_delete AFTER DELETE ON users BEGIN
+            {_bump_counter("'users'", "'total'", -1)}
+            {_bump_counter("'role'", "OLD.role", -1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_users_role AFTER UPDATE OF role ON users
+        WHEN OLD.role IS NOT NEW.role BEGIN
+            {_bump_counter("'role'", "OLD.role", -1)}
+            {_bump_counter("'role'", "NEW.role", 1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_history_insert AFTER INSERT ON analysis_history BEGIN
+            {_bump_counter("'classifications'", "'total'", 1)}
+            {_bump_counter("'disease'", "COALESCE(NEW.prediction, '')", 1)}
+            {_bump_counter("'day'", "COALESCE(date(NEW.analysis_date), '')", 1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_history_delete AFTER DELETE ON analysis_history BEGIN
+            {_bump_counter("'classifications'", "'total'", -1)}
+            {_bump_counter("'disease'", "COALESCE(OLD.prediction, '')", -1)}
+            {_bump_counter("'day'", "COALESCE(date(OLD.analysis_date), '')", -1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_history_update AFTER UPDATE OF prediction, analysis_date ON analysis_history
+        BEGIN
+            {_bump_counter("'disease'", "COALESCE(OLD.prediction, '')", -1)}
+            {_bump_counter("'day'", "COALESCE(date(OLD.analysis_date), '')", -1)}
+            {_bump_counter("'disease'", "COALESCE(NEW.prediction, '')", 1)}
+            {_bump_counter("'day'", "COALESCE(date(NEW.analysis_date), '')", 1)}
+        END
+    ''',
+]
+
+# Recompute every counter from the base tables
+STATS_REBUILD = [
+    'DELETE FROM stats_counters',
+    "INSERT INTO stats_counters SELECT 'users', 'total', COUNT(*) FROM users",
+    "INSERT INTO stats_counters SELECT 'role', role, COUNT(*) FROM users GROUP BY role",
+    "INSERT INTO stats_counters SELECT 'classifications', 'total', COUNT(*) FROM analysis_history",
+    '''INSERT INTO stats_counters SELECT 'disease', COALESCE(prediction, ''), COUNT(*)
+       FROM analysis_history GROUP BY 1, 2''',
+    '''INSERT INTO stats_counters SELECT 'day', COALESCE(date(analysis_date), ''), COUNT(*)
+       FROM analysis_history GROUP BY 1, 2''',
+]
+
+_RESULT_DISEASE = "COALESCE((SELECT name FROM disease_classes WHERE id = {0}.disease_id), '')"
+_RESULT_DAY = "COALESCE((SELECT date(created_at) FROM analysis_sessions WHERE id = {0}.session_id), '')"
+
+RESULTS_STATS_TRIGGERS = [
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_results_insert AFTER INSERT ON analysis_results BEGIN
+            {_bump_counter("'classifications'", "'total'", 1)}
+            {_bump_counter("'disease'", _RESULT_DISEASE.format('NEW'), 1)}
+            {_bump_counter("'day'", _RESULT_DAY.format('NEW'), 1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_results_delete AFTER DELETE ON analysis_results BEGIN
+            {_bump_counter("'classifications'", "'total'", -1)}
+            {_bump_counter("'disease'", _RESULT_DISEASE.format('OLD'), -1)}
+            {_bump_counter("'day'", _RESULT_DAY.format('OLD'), -1)}
+        END
+    ''',
+    f'''
+        CREATE TRIGGER IF NOT EXISTS stats_results_disease AFTER UPDATE OF disease_id ON analysis_results
+        WHEN OLD.disease_id IS NOT NEW.disease_id BEGIN
+            {_bump_counter("'disease'", _RESULT_DISEASE.format('OLD'), -1)}
+            {_bump_counter("'disease'", _RESULT_DISEASE.format('NEW'), 1)}
+        END
+    ''',
+]
+
+RESULTS_STATS_REBUILD = [
+    'DELETE FROM stats_counters',
+    "INSERT INTO stats_counters SELECT 'users', 'total', COUNT(*) FROM users",
+    "INSERT INTO stats_counters SELECT 'role', role, COUNT(*) FROM users GROUP BY role",
+    "INSERT INTO stats_counters SELECT 'classifications', 'total', COUNT(*) FROM analysis_results",
+    '''INSERT INTO stats_counters SELECT 'disease', COALESCE(d.name, ''), COUNT(*)
+       FROM analysis_results r LEFT JOIN disease_classes d ON d.id = r.disease_id
+       GROUP BY r.disease_id''',
+    '''INSERT INTO stats_counters SELECT 'day', COALESCE(date(s.created_at), ''), COUNT(*)
+       FROM analysis_sessions s JOIN analysis_results r ON r.session_id = s.id
+       GROUP BY 1, 2''',
+]
+
+# Schema migrations applied on top of the base tables created by init_database.
+# Migration N brings the database to PRAGMA user_version = N; never edit a
+# released migration, append a new one instead.
+MIGRATIONS = [
+    # 1: indexes for history, recent activity and email lookups
+    [
+        'CREATE INDEX IF NOT EXISTS idx_history_user_date ON analysis_history (user_id, analysis_date)',
+        'CREATE INDEX IF NOT EXISTS idx_history_date ON analysis_history (analysis_date)',
+        'CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)',
+    ],
+    # 2: trigger-maintained counters for the admin dashboard
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID
+        ''',
+        *STATS_TRIGGERS,
+        *STATS_REBUILD,
+    ],
+    # 3: de-duplication key and progress tracking for bulk imports
+    [
+        'ALTER TABLE analysis_history ADD COLUMN source_key TEXT',
+        '''CREATE UNIQUE INDEX IF NOT EXISTS idx_history_source_key ON analysis_history (source_key)
+           WHERE source_key IS NOT NULL''',
+        '''
+        CREATE TABLE IF NOT EXISTS import_progress (
+            source TEXT PRIMARY KEY,
+            records_done INTEGER NOT NULL,
+            rows_imported INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ],
+    # 4: normalize analysis_history into sessions + per-image results with a disease FK
+    [
+        'CREATE TABLE IF NOT EXISTS disease_classes (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)',
+        '''
+        CREATE TABLE IF NOT EXISTS analysis_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total_images INTEGER NOT NULL DEFAULT 0,
+            source_key TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS analysis_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            image_index INTEGER NOT NULL,
+            image_filename TEXT,
+            disease_id INTEGER,
+            confidence REAL,
+            probabilities BLOB,
+            details TEXT,
+            UNIQUE (session_id, image_index),
+            FOREIGN KEY (session_id) REFERENCES analysis_sessions (id),
+            FOREIGN KEY (disease_id) REFERENCES disease_classes (id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_user_date ON analysis_sessions (user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_date ON analysis_sessions (created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_results_disease ON analysis_results (disease_id)',
+        '''CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_source_key ON analysis_sessions (source_key)
+           WHERE source_key IS NOT NULL''',
+
+        # Rows saved by the same user at the same timestamp were one upload
+        '''INSERT INTO disease_classes (name)
+           SELECT DISTINCT prediction FROM analysis_history WHERE prediction IS NOT NULL''',
+        '''INSERT INTO analysis_sessions (user_id, created_at, total_images, source_key)
+           SELECT user_id, analysis_date, COUNT(*), MAX(rtrim(rtrim(source_key, '0123456789'), '|'))
+           FROM analysis_history GROUP BY user_id, analysis_date ORDER BY MIN(id)''',
+        '''INSERT INTO analysis_results (id, session_id, image_index, image_filename, disease_id, confidence, details)
+           SELECT h.id, s.id, ROW_NUMBER() OVER (PARTITION BY h.user_id, h.analysis_date ORDER BY h.id) - 1,
+                  h.image_filename, d.id, h.confidence, h.details
+           FROM analysis_history h
+           JOIN analysis_sessions s ON s.user_id = h.user_id AND s.created_at IS h.analysis_date
+           LEFT JOIN disease_classes d ON d.name = h.prediction''',
+        'DROP TABLE analysis_history',
+
+        # Read-only view with the old flat columns for ad-hoc queries
+        '''
+        CREATE VIEW analysis_history AS
+        SELECT r.id, s.user_id, r.image_filename, d.name AS prediction, r.confidence,
+               s.created_at AS analysis_date, r.details, r.session_id, r.image_index
+        FROM analysis_results r
+        JOIN analysis_sessions s ON s.id = r.session_id
+        LEFT JOIN disease_classes d ON d.id = r.disease_id
+        ''',
+        *RESULTS_STATS_TRIGGERS,
+        *RESULTS_STATS_REBUILD,
+    ],
+    # 5: store the password hash scheme with each user (existing hashes are the legacy scheme)
+    [
+        "ALTER TABLE users ADD COLUMN hash_scheme TEXT NOT NULL DEFAULT 'pbkdf2_sha256:100000'",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def get_schema_version(conn):
+    """Get the schema version stored in the database"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate_database(conn, target_version=SCHEMA_VERSION):
+    """
+    Apply pending migrations up to target_version, one transaction per migration.
+    Safe with several processes starting at once: each migration takes the write
+    lock (BEGIN IMMEDIATE) and re-reads user_version, so one already applied by
+    another process is skipped.
+    """
+    current_version = get_schema_version(conn)
+
+    for version in range(current_version + 1, target_version + 1):
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for statement in MIGRATIONS[version - 1]:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return get_schema_version(conn)
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """Cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters, hit rate and current size"""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+# Profiles and roles change rarely; the TTL bounds staleness for writes made
+# outside this process (e.g. admin_setup.py)
+USER_CACHE_TTL = 300
+profile_cache = TTLCache(ttl=USER_CACHE_TTL)
+role_cache = TTLCache(ttl=USER_CACHE_TTL)
+
+def _user_cache_key(user_id):
+    return (DB_FILE, user_id)
+
+def invalidate_user_cache(user_id):
+    """Drop cached profile and role of one user"""
+    key = _user_cache_key(user_id)
+    profile_cache.invalidate(key)
+    role_cache.invalidate(key)
+
+def get_user_cache_stats():
+    """Hit-rate stats of the profile and role caches"""
+    return {'profile': profile_cache.stats(), 'role': role_cache.stats()}
+
+# Password hashes are stored with the scheme that produced them
+# ("<algorithm>:<iterations>"), so the parameters can be raised without
+# invalidating existing accounts: a successful login with an older scheme
+# transparently rehashes the password with PASSWORD_SCHEME.
+LEGACY_PASSWORD_SCHEME = 'pbkdf2_sha256:100000'
+PASSWORD_SCHEME = os.environ.get('CASSAVA_PASSWORD_SCHEME', LEGACY_PASSWORD_SCHEME)
+
+# PBKDF2 runs in a bounded thread pool: hashlib.pbkdf2_hmac releases the GIL,
+# so a burst of logins hashes in parallel on all cores. Threads, not processes:
+# spawned workers would re-import the Streamlit main script (app.py).
+AUTH_WORKERS = int(os.environ.get('CASSAVA_AUTH_WORKERS', os.cpu_count() or 1))
+AUTH_TIMEOUT = float(os.environ.get('CASSAVA_AUTH_TIMEOUT', 10))
+
+def _parse_scheme(scheme):
+    """'pbkdf2_sha256:100000' -> ('sha256', 100000)"""
+    algorithm, iterations = scheme.split(':')
+    if not algorithm.startswith('pbkdf2_'):
+        raise ValueError(f"Unsupported password scheme: {scheme}")
+    return algorithm[len('pbkdf2_'):], int(iterations)
+
+def _derive_key(password, salt, scheme):
+    digest, iterations = _parse_scheme(scheme)
+    return hashlib.pbkdf2_hmac(digest, password.encode('utf-8'), salt.encode(), iterations).hex()
+
+def _hash_password_task(password, scheme):
     salt = secrets.token_hex(32)
-    pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode(), 100000)
-    return pwd_hash.hex(), salt
+    return _derive_key(password, salt, scheme), salt
+
+def _verify_password_task(stored_hash, stored_salt, provided_password, scheme):
+    return hmac.compare_digest(_derive_key(provided_password, stored_salt, scheme), stored_hash)
+
+class AuthTimeoutError(Exception):
+    """Password hashing did not finish within the auth pool timeout"""
+
+class AuthPool:
+    """
+    Thread pool for password hashing. Workers start on first use; with
+    max_workers=0 hashing runs inline in the calling thread.
+    """
+
+    def __init__(self, max_workers=AUTH_WORKERS, timeout=AUTH_TIMEOUT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stats = {'tasks': 0, 'timeouts': 0, 'task_ms_total': 0.0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='auth')
+            return self._executor
+
+    def run(self, fn, *args):
+        """Run fn(*args) in a worker; raise AuthTimeoutError after `timeout` seconds"""
+        start = time.perf_counter()
+        try:
+            if self.max_workers <= 0:
+                return fn(*args)
+
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise AuthTimeoutError(f"Password hashing took longer than {self.timeout:.0f}s")
+        finally:
+            with self._lock:
+                self._stats['tasks'] += 1
+                self._stats['task_ms_total'] += (time.perf_counter() - start) * 1000
+
+    def warm_up(self):
+        """Start all workers now instead of on the first login"""
+        if self.max_workers > 0:
+            executor = self._get_executor()
+            list(executor.map(_parse_scheme, [PASSWORD_SCHEME] * self.max_workers))
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, max_workers=self.max_workers)
+        stats['avg_task_ms'] = stats['task_ms_total'] / stats['tasks'] if stats['tasks'] else 0.0
+        return stats
 
-def verify_password(stored_hash, stored_salt, provided_password):
-    """Verify password"""
-    pwd_hash = hashlib.pbkdf2_hmac('sha256', provided_password.encode('utf-8'), stored_salt.encode(), 100000)
-    return pwd_hash.hex() == stored_hash
+auth_pool = AuthPool()
+atexit.register(auth_pool.close)
+
+def hash_password(password, scheme=None):
+    """Hash password with salt: (hash, salt, scheme)"""
+    scheme = scheme or PASSWORD_SCHEME
+    pwd_hash, salt = auth_pool.run(_hash_password_task, password, scheme)
+    return pwd_hash, salt, scheme
+
+def verify_password(stored_hash, stored_salt, provided_password, scheme=LEGACY_PASSWORD_SCHEME):
+    """Verify password against a hash produced with `scheme`"""
+    return auth_pool.run(_verify_password_task, stored_hash, stored_salt, provided_password, scheme)
 
 def register_user(email, username, password, full_name="", role="user"):
-    """Register a new user (user role only, admin by default)"""
+    """Register a new user (user role only, admin by default): (success, message, user_id)"""
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
-        pwd_hash, salt = hash_password(password)
+        pwd_hash, salt, scheme = hash_password(password)
 
         # Ensure role is valid
         if role not in ['admin', 'user']:
             role = 'user'
 
         cursor.execute('''
-            INSERT INTO users (email, username, password_hash, salt, role)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (email, username, pwd_hash, salt, role))
+            INSERT INTO users (email, username, password_hash, salt, hash_scheme, role)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (email, username, pwd_hash, salt, scheme, role))
 
         user_id = cursor.lastrowid
 
@@ -99,11 +619,13 @@ def register_user(email, username, password, full_name="", role="user"):
 
         conn.commit()
         conn.close()
-        return True, "Akun berhasil dibuat! ✅"
+        return True, "Akun berhasil dibuat! ✅", user_id
     except sqlite3.IntegrityError:
-        return False, "Username sudah terdaftar! ❌"
+        return False, "Username sudah terdaftar! ❌", None
+    except AuthTimeoutError:
+        return False, "Server sedang sibuk, silakan coba lagi! ⏳", None
     except Exception as e:
-        return False, f"Error: {str(e)}"
+        return False, f"Error: {str(e)}", None
 
 def login_user(username_or_email, password):
     """Login user with username or email and password"""
@@ -115,15 +637,25 @@ def login_user(username_or_email, password):
         cursor.execute('SELECT * FROM users WHERE username = ? OR email = ?', (username_or_email, username_or_email))
         user = cursor.fetchone()
 
-        if user and verify_password(user['password_hash'], user['salt'], password):
-            # Update last login
+        if user and verify_password(user['password_hash'], user['salt'], password, user['hash_scheme']):
+            # Rehash with the current parameters while the plaintext is at hand; hashed
+            # before the first write so the write lock is never held during PBKDF2
+            rehash = hash_password(password) if user['hash_scheme'] != PASSWORD_SCHEME else None
+
+            # Update last login (and the new hash) in one short transaction
             cursor.execute('UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?', (user['id'],))
+            if rehash:
+                cursor.execute('UPDATE users SET password_hash = ?, salt = ?, hash_scheme = ? WHERE id = ?',
+                               (*rehash, user['id']))
             conn.commit()
             conn.close()
+            invalidate_user_cache(user['id'])
             return True, user['id'], user['username'], user['role']
         else:
             conn.close()
             return False, None, None, "Username/email atau password salah! ❌"
+    except AuthTimeoutError:
+        return False, None, None, "Server sedang sibuk, silakan coba lagi! ⏳"
     except Exception as e:
         return False, None, None, f"Error: {str(e)}"
 
@@ -162,12 +694,18 @@ def login_or_register_google(email, name):
         
         conn.commit()
         conn.close()
+        invalidate_user_cache(user['id'])
         return True, user['id'], user['username'], user['email'], user['role']
     except Exception as e:
         return False, None, None, None, f"Error: {str(e)}"
 
 def get_user_profile(user_id):
-    """Get user profile"""
+    """Get user profile (cached, see profile_cache)"""
+    key = _user_cache_key(user_id)
+    profile = profile_cache.get(key)
+    if profile is not None:
+        return dict(profile)
+
     try:
         conn = get_connection()
         cursor = conn.cursor()
@@ -181,46 +719,664 @@ def get_user_profile(user_id):
         
         profile = cursor.fetchone()
         conn.close()
-        return dict(profile) if profile else None
     except Exception as e:
         return None
 
-def save_analysis(user_id, image_filename, prediction, confidence, details=""):
-    """Save analysis to history"""
+    if profile is None:
+        return None
+    profile = dict(profile)
+    profile_cache.put(key, profile)
+    role_cache.put(key, profile['role'])
+    return dict(profile)
+
+SESSION_INSERT = '''
+    INSERT INTO analysis_sessions (user_id, created_at, total_images, source_key)
+    VALUES (?, ?, ?, ?)
+'''
+
+RESULT_INSERT = '''
+    INSERT INTO analysis_results
+        (session_id, image_index, image_filename, disease_id, confidence, probabilities, details)
+    VALUES (?, ?, ?, (SELECT id FROM disease_classes WHERE name = ?), ?, ?, ?)
+'''
+
+# Sessions with a source_key (bulk imports) skip rows that were already imported;
+# OR IGNORE would also hide NOT NULL violations, so it is only used for them
+SESSION_INSERT_OR_IGNORE = SESSION_INSERT.replace('INSERT', 'INSERT OR IGNORE', 1)
+RESULT_INSERT_OR_IGNORE = RESULT_INSERT.replace('INSERT', 'INSERT OR IGNORE', 1)
+
+def encode_probabilities(probabilities):
+    """Pack a softmax vector as float32 bytes for analysis_results.probabilities"""
+    return array('f', probabilities).tobytes() if probabilities is not None else None
+
+def decode_probabilities(blob):
+    """Unpack analysis_results.probabilities into a list of floats"""
+    if blob is None:
+        return None
+    values = array('f')
+    values.frombytes(blob)
+    return values.tolist()
+
+def _result_row(result):
+    """(image_filename, prediction, confidence, details, probabilities) from a result dict"""
+    return (
+        result.get('image_filename'),
+        result.get('prediction'),
+        result.get('confidence'),
+        result.get('details', ""),
+        encode_probabilities(result.get('probabilities'))
+    )
+
+def _session(user_id, results, created_at=None, source_key=None):
+    """Session tuple for _insert_sessions; created_at defaults to now (UTC, same format as CURRENT_TIMESTAMP)"""
+    if created_at is None:
+        created_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return (user_id, created_at, list(results), source_key)
+
+def _insert_sessions(conn, sessions):
+    """
+    Insert sessions and their results (caller commits).
+    Sessions with an existing source_key and their already imported results are
+    skipped; sessions without a source_key raise on any constraint error.
+    Returns the number of results inserted.
+    """
+    labels = {result[1] for session in sessions for result in session[2] if result[1] is not None}
+    conn.executemany('INSERT OR IGNORE INTO disease_classes (name) VALUES (?)', [(label,) for label in labels])
+
+    inserted = 0
+    for user_id, created_at, results, source_key in sessions:
+        if source_key is None:
+            session_insert, result_insert = SESSION_INSERT, RESULT_INSERT
+        else:
+            session_insert, result_insert = SESSION_INSERT_OR_IGNORE, RESULT_INSERT_OR_IGNORE
+
+        cursor = conn.execute(session_insert, (user_id, created_at, len(results), source_key))
+        if cursor.rowcount > 0:
+            session_id = cursor.lastrowid
+        else:
+            existing = conn.execute(
+                'SELECT id FROM analysis_sessions WHERE source_key = ?', (source_key,)
+            ).fetchone()
+            if existing is None:
+                # Ignored for another constraint (e.g. user_id NULL), not as a duplicate
+                raise sqlite3.IntegrityError(f"Session {source_key!r} violates a constraint")
+            session_id = existing[0]
+
+        rows = [
+            (session_id, index, image_filename, prediction, confidence, probabilities, details)
+            for index, (image_filename, prediction, confidence, details, probabilities) in enumerate(results)
+        ]
+        # rowcount excludes rows ignored as duplicates and rows written by triggers
+        inserted += max(conn.executemany(result_insert, rows).rowcount, 0)
+    return inserted
+
+# Retries for transient lock errors when writing analysis sessions
+WRITE_RETRIES = 5
+WRITE_RETRY_BACKOFF = 0.05   # seconds, doubled after every attempt
+
+def _is_transient_error(error):
+    """Lock contention that is worth retrying (busy_timeout already expired once)"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+def _write_sessions(sessions, retries=WRITE_RETRIES, backoff=WRITE_RETRY_BACKOFF):
+    """
+    Insert sessions in a single transaction, retrying transient lock errors with
+    exponential backoff. Returns the number of retries; raises on persistent errors.
+    """
+    for attempt in range(retries + 1):
+        conn = get_connection()
+        try:
+            _insert_sessions(conn, sessions)
+            conn.commit()
+            return attempt
+        except Exception as e:
+            conn.rollback()
+            if attempt == retries or not _is_transient_error(e):
+                raise
+        finally:
+            conn.close()
+        time.sleep(backoff * (2 ** attempt))
+
+_FLUSH = object()
+_STOP = object()
+
+class AnalysisWriter:
+    """
+    Background writer for analysis history: save_analysis only enqueues the
+    session, a single thread groups pending sessions into one transaction every
+    `batch_size` sessions or `flush_interval_ms`, whichever comes first.
+
+    The queue is bounded; when it is full the caller blocks for up to
+    `put_timeout` seconds and then writes its session synchronously, so
+    results are never dropped.
+
+    Lock errors are retried with backoff. If a batch still fails, its sessions
+    are written one at a time so one bad row does not discard the others;
+    sessions that cannot be written are kept in failed_sessions() (and can be
+    re-queued with retry_failed()) instead of being dropped.
+    """
+
+    def __init__(self, batch_size=64, flush_interval_ms=200, max_queue_size=10000, put_timeout=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._failed = []  # (session, error) that could not be written
+        self._stats = {
+            'submitted': 0, 'rows_written': 0, 'failed_rows': 0, 'failed_sessions': 0,
+            'retries': 0, 'split_batches': 0, 'batches': 0,
+            'max_batch_size': 0, 'flush_ms_total': 0.0, 'max_flush_ms': 0.0,
+            'max_queue_depth': 0, 'blocked_puts': 0, 'blocked_ms_total': 0.0,
+            'sync_fallbacks': 0, 'last_error': None
+        }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='analysis-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, session):
+        """Queue one session (tuple from _session)"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(session)
+        except queue.Full:
+            start = time.perf_counter()
+            try:
+                self._queue.put(session, timeout=self.put_timeout)
+            except queue.Full:
+                self._write_batch([session])
+                with self._lock:
+                    self._stats['sync_fallbacks'] += 1
+            finally:
+                with self._lock:
+                    self._stats['blocked_puts'] += 1
+                    self._stats['blocked_ms_total'] += (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queue.qsize())
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = [] if item is _FLUSH else [item]
+            markers = 1 if item is _FLUSH else 0
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+
+            while batch and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _FLUSH or item is _STOP:
+                    markers += 1
+                    stop = item is _STOP
+                    break
+                batch.append(item)
+
+            if batch:
+                self._write_batch(batch)
+            for _ in range(len(batch) + markers):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, sessions):
+        """Insert sessions in a single transaction, one session at a time if the batch fails"""
+        num_results = sum(len(session[2]) for session in sessions)
+        start = time.perf_counter()
+        retries, failed = 0, []
+        try:
+            retries += _write_sessions(sessions)
+        except Exception as e:
+            if len(sessions) == 1:
+                failed.append((sessions[0], str(e)))
+            else:
+                with self._lock:
+                    self._stats['split_batches'] += 1
+                for session in sessions:
+                    try:
+                        retries += _write_sessions([session])
+                    except Exception as session_error:
+                        failed.append((session, str(session_error)))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        failed_rows = sum(len(session[2]) for session, _ in failed)
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['retries'] += retries
+            self._stats['rows_written'] += num_results - failed_rows
+            self._stats['failed_rows'] += failed_rows
+            self._stats['failed_sessions'] += len(failed)
+            self._stats['max_batch_size'] = max(self._stats['max_batch_size'], len(sessions))
+            self._stats['flush_ms_total'] += elapsed_ms
+            self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed_ms)
+            if failed:
+                self._failed.extend(failed)
+                self._stats['last_error'] = failed[-1][1]
+
+        for session, error in failed:
+            print(f"⚠️ Riwayat analisis user {session[0]} ({len(session[2])} gambar) gagal disimpan: {error}")
+
+    def failed_sessions(self):
+        """Sessions that could not be written, as (session, error) pairs"""
+        with self._lock:
+            return list(self._failed)
+
+    def retry_failed(self):
+        """Queue failed sessions again; returns how many were re-queued"""
+        with self._lock:
+            failed, self._failed = self._failed, []
+        for session, _ in failed:
+            self.submit(session)
+        return len(failed)
+
+    def flush(self):
+        """Write all queued sessions now and wait until they are committed"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self, timeout=10.0):
+        """Flush remaining sessions and stop the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Queue, batching and back-pressure metrics"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['avg_rows_per_batch'] = stats['rows_written'] / stats['batches'] if stats['batches'] else 0.0
+        stats['avg_flush_ms'] = stats['flush_ms_total'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+analysis_writer = AnalysisWriter()
+atexit.register(analysis_writer.close)
+
+def save_analysis_session(user_id, results, sync=False):
+    """
+    Save one upload session with one result per image
+    results: list of dicts with image_filename, prediction, confidence and
+    optionally details and probabilities (full softmax vector)
+    Queued to the background writer by default; sync=True writes before returning
+    """
+    try:
+        # Timestamp taken now, not when the batch is written
+        session = _session(user_id, [_result_row(result) for result in results])
+
+        if not sync:
+            analysis_writer.submit(session)
+            return True
+
+        _write_sessions([session])
+        return True
+    except Exception as e:
+        return False
+
+def start_analysis_session(user_id):
+    """
+    Create an empty upload session and return its id (None on failure), for
+    uploads whose results are saved one image at a time with
+    save_analysis(..., session_id=...)
+    """
     try:
         conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO analysis_history (user_id, image_filename, prediction, confidence, details)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, image_filename, prediction, confidence, details))
-        
+        try:
+            cursor = conn.execute(SESSION_INSERT, (user_id, _session(user_id, [])[1], 0, None))
+            conn.commit()
+            return cursor.lastrowid
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    except Exception as e:
+        return None
+
+def _append_to_session(session_id, result):
+    """Add one result to an existing session as its next image (synchronous)"""
+    conn = get_connection()
+    try:
+        # UPDATE first: takes the write lock before the next image_index is read
+        cursor = conn.execute('UPDATE analysis_sessions SET total_images = total_images + 1 WHERE id = ?',
+                              (session_id,))
+        if cursor.rowcount == 0:
+            raise ValueError(f"Analysis session {session_id} does not exist")
+        image_index = conn.execute('SELECT total_images - 1 FROM analysis_sessions WHERE id = ?',
+                                   (session_id,)).fetchone()[0]
+        conn.executemany('INSERT OR IGNORE INTO disease_classes (name) VALUES (?)',
+                         [(result[1],)] if result[1] is not None else [])
+        image_filename, prediction, confidence, details, probabilities = result
+        conn.execute(RESULT_INSERT, (session_id, image_index, image_filename, prediction, confidence,
+                                     probabilities, details))
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
+
+def save_analysis(user_id, image_filename, prediction, confidence, details="", sync=False, probabilities=None,
+                  session_id=None):
+    """
+    Save analysis of a single image to history.
+
+    Without session_id every call is a new single-image session. For a
+    multi-image upload use save_analysis_session with all results, or, when
+    results arrive one by one, start_analysis_session once and pass its id
+    here (written synchronously) so the upload stays one session.
+    """
+    result = {
+        'image_filename': image_filename,
+        'prediction': prediction,
+        'confidence': confidence,
+        'details': details,
+        'probabilities': probabilities
+    }
+    if session_id is None:
+        return save_analysis_session(user_id, [result], sync=sync)
+
+    try:
+        _append_to_session(session_id, _result_row(result))
         return True
     except Exception as e:
         return False
 
+def save_analyses(rows):
+    """
+    Save many analyses in a single transaction
+    rows: iterable of (user_id, image_filename, prediction, confidence[, details[, analysis_date]])
+    Consecutive rows with the same user_id and analysis_date form one session.
+    Returns the number of rows saved (0 on failure)
+    """
+    sessions = []
+    for user_id, image_filename, prediction, confidence, *rest in rows:
+        details = rest[0] if len(rest) > 0 else ""
+        analysis_date = rest[1] if len(rest) > 1 else None
+        result = (image_filename, prediction, confidence, details, None)
+        if sessions and analysis_date is not None and sessions[-1][:2] == (user_id, analysis_date):
+            sessions[-1][2].append(result)
+        else:
+            sessions.append(_session(user_id, [result], analysis_date))
+
+    conn = get_connection()
+    try:
+        saved = _insert_sessions(conn, sessions)
+        conn.commit()
+        return saved
+    except Exception as e:
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
+
+LEGACY_HISTORY_FILE = "analysis_history.json"
+LEGACY_TIMESTAMP_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+# analysis_history.json stores bare class labels; the app saves the display names
+LEGACY_LABELS = {
+    'Bacterial Blight': '🔴 Bacterial Blight',
+    'Brown Spot': '🟤 Brown Spot',
+    'Green Mite': '🐜 Green Mite',
+    'Healthy': '🌿 Daun Sehat (Healthy Leaf)',
+    'Mosaic': '🟢 Mosaic',
+}
+
+def _iter_json_array(path, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON array, reading the file in chunks"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, started, eof = '', False, False
+        while True:
+            buffer = buffer.lstrip()
+            if started and buffer.startswith(','):
+                buffer = buffer[1:].lstrip()
+
+            if buffer:
+                if not started:
+                    if buffer[0] != '[':
+                        raise ValueError(f"{path}: expected a JSON array")
+                    buffer, started = buffer[1:], True
+                    continue
+                if buffer[0] == ']':
+                    return
+                try:
+                    element, end = decoder.raw_decode(buffer)
+                    # An element ending exactly at the buffer end may be truncated (e.g. a number)
+                    if end < len(buffer) or eof:
+                        buffer = buffer[end:]
+                        yield element
+                        continue
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+
+            if eof:
+                raise ValueError(f"{path}: unexpected end of JSON array")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+def _legacy_record_session(record):
+    """
+    Convert one analysis_history.json record into a session (one result per image),
+    keyed by user_id|timestamp so re-imports are skipped.
+    Confidence is stored as a 0-1 fraction (the JSON file stores percentages)
+    and labels are mapped to the class names the app saves (LEGACY_LABELS).
+    """
+    timestamp = str(record.get('timestamp', ''))
+    try:
+        analysis_date = datetime.strptime(timestamp, LEGACY_TIMESTAMP_FORMAT).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        analysis_date = timestamp
+
+    user_id = record.get('user_id')
+    results = [
+        (None, LEGACY_LABELS.get(result.get('label'), result.get('label')),
+         (result.get('confidence') or 0) / 100, "", None)
+        for result in record.get('results') or []
+    ]
+    return _session(user_id, results, analysis_date, source_key=f"{user_id}|{timestamp}")
+
+def _commit_import_batch(source, sessions, records_done, rows_imported):
+    """Insert one import batch and record progress in the same transaction; returns results inserted"""
+    conn = get_connection()
+    try:
+        inserted = _insert_sessions(conn, sessions)
+        conn.execute('''
+            INSERT INTO import_progress (source, records_done, rows_imported, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (source) DO UPDATE SET
+                records_done = excluded.records_done,
+                rows_imported = excluded.rows_imported,
+                updated_at = excluded.updated_at
+        ''', (source, records_done, rows_imported + inserted))
+        conn.commit()
+        return inserted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def import_legacy_history(path=LEGACY_HISTORY_FILE, batch_size=500, resume=True):
+    """
+    Stream analysis_history.json into analysis_sessions/analysis_results.
+
+    The file is parsed incrementally and committed every `batch_size` records
+    together with the number of records done, so an interrupted import resumes
+    where it stopped. Results are keyed by (user_id, timestamp, result index) and
+    duplicates are ignored, so re-running the import is safe.
+    Labels that are not an existing disease class are reported in `new_classes`.
+    """
+    source = os.path.abspath(path)
+    conn = get_connection()
+    progress = conn.execute(
+        'SELECT records_done, rows_imported FROM import_progress WHERE source = ?', (source,)
+    ).fetchone()
+    classes_before = {row[0] for row in conn.execute('SELECT name FROM disease_classes')}
+    conn.close()
+
+    start_record = progress['records_done'] if progress and resume else 0
+    rows_imported = progress['rows_imported'] if progress and resume else 0
+    summary = {'resumed_from': start_record, 'records': 0, 'rows_imported': 0, 'duplicates': 0}
+    records_done = start_record
+
+    def commit(sessions):
+        nonlocal records_done, rows_imported
+        records_done += len(sessions)
+        inserted = _commit_import_batch(source, sessions, records_done, rows_imported)
+        rows_imported += inserted
+        summary['records'] += len(sessions)
+        summary['rows_imported'] += inserted
+        summary['duplicates'] += sum(len(session[2]) for session in sessions) - inserted
+
+    pending = []
+    for record_index, record in enumerate(_iter_json_array(path)):
+        if record_index < start_record:
+            continue
+        pending.append(_legacy_record_session(record))
+        if len(pending) >= batch_size:
+            commit(pending)
+            pending = []
+    commit(pending)
+
+    conn = get_connection()
+    classes_after = {row[0] for row in conn.execute('SELECT name FROM disease_classes')}
+    conn.close()
+    summary['new_classes'] = sorted(classes_after - classes_before)
+
+    return summary
+
+# CROSS JOIN keeps analysis_sessions as the outer loop so the date index
+# drives the ORDER BY instead of a full scan + sort of analysis_results
+HISTORY_QUERY = '''
+    SELECT
+        r.id,
+        s.user_id,
+        r.session_id,
+        r.image_index,
+        r.image_filename,
+        d.name AS prediction,
+        r.confidence,
+        s.created_at AS analysis_date,
+        r.details
+    FROM analysis_sessions s
+    CROSS JOIN analysis_results r ON r.session_id = s.id
+    LEFT JOIN disease_classes d ON d.id = r.disease_id
+'''
+
+def _fetch_page(query, params, cursor, limit, date_column='s.created_at', id_column='r.id'):
+    """
+    Run a keyset-paginated history query ordered by (date, id) DESC.
+    `query` must end with a WHERE clause and select the date/id columns as
+    analysis_date/id; `cursor` is the (analysis_date, id) of the last row of
+    the previous page, or None for the first page.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor is not None:
+        # The plain date bound lets SQLite range-scan the date index
+        query += f' AND {date_column} <= ? AND ({date_column}, {id_column}) < (?, ?)'
+        params = tuple(params) + (cursor[0],) + tuple(cursor)
+    query += f' ORDER BY {date_column} DESC, {id_column} DESC LIMIT ?'
+
+    conn = get_connection()
+    rows = [dict(row) for row in conn.execute(query, tuple(params) + (limit,))]
+    conn.close()
+
+    next_cursor = (rows[-1]['analysis_date'], rows[-1]['id']) if len(rows) == limit else None
+    return rows, next_cursor
+
+def get_user_history_page(user_id, limit=10, cursor=None):
+    """Get one page of user's analysis history (one row per image), newest first: (rows, next_cursor)"""
+    try:
+        return _fetch_page(HISTORY_QUERY + ' WHERE s.user_id = ?', (user_id,), cursor, limit)
+    except Exception as e:
+        return [], None
+
 def get_user_history(user_id, limit=10):
     """Get user's analysis history"""
+    return get_user_history_page(user_id, limit)[0]
+
+def iter_user_history(user_id, page_size=500):
+    """Yield user's analysis history lazily, newest first, one page in memory at a time"""
+    cursor = None
+    while True:
+        rows, cursor = get_user_history_page(user_id, page_size, cursor)
+        yield from rows
+        if cursor is None:
+            return
+
+def get_user_sessions_page(user_id, limit=10, cursor=None):
+    """Get one page of user's upload sessions with per-session aggregates: (rows, next_cursor)"""
+    try:
+        return _fetch_page('''
+            SELECT
+                s.id,
+                s.created_at AS analysis_date,
+                s.total_images,
+                (SELECT AVG(confidence) FROM analysis_results WHERE session_id = s.id) AS avg_confidence
+            FROM analysis_sessions s
+            WHERE s.user_id = ?
+        ''', (user_id,), cursor, limit, id_column='s.id')
+    except Exception as e:
+        return [], None
+
+def get_session_results(session_id):
+    """Get all per-image results of one session, probabilities decoded"""
     try:
         conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM analysis_history 
-            WHERE user_id = ? 
-            ORDER BY analysis_date DESC 
-            LIMIT ?
-        ''', (user_id, limit))
-        
-        history = cursor.fetchall()
+        rows = conn.execute('''
+            SELECT r.id, r.image_index, r.image_filename, d.name AS prediction, r.confidence,
+                   r.probabilities, r.details
+            FROM analysis_results r
+            LEFT JOIN disease_classes d ON d.id = r.disease_id
+            WHERE r.session_id = ?
+            ORDER BY r.image_index
+        ''', (session_id,)).fetchall()
         conn.close()
-        return [dict(row) for row in history]
+        return [dict(row, probabilities=decode_probabilities(row['probabilities'])) for row in rows]
     except Exception as e:
         return []
 
+def get_user_disease_counts(user_id):
+    """Get classification count per disease for one user"""
+    try:
+        conn = get_connection()
+        rows = conn.execute('''
+            SELECT COALESCE(d.name, '') AS disease, counts.count
+            FROM (
+                SELECT r.disease_id, COUNT(*) AS count
+                FROM analysis_sessions s
+                JOIN analysis_results r ON r.session_id = s.id
+                WHERE s.user_id = ?
+                GROUP BY r.disease_id
+            ) counts
+            LEFT JOIN disease_classes d ON d.id = counts.disease_id
+        ''', (user_id,)).fetchall()
+        conn.close()
+        return {row['disease']: row['count'] for row in rows}
+    except Exception as e:
+        return {}
+
 def email_exists(email):
     """Check if email already exists"""
     if not email:  # Allow null emails for username-only login
@@ -248,17 +1404,26 @@ def username_exists(username):
         return False
 
 def get_user_role(user_id):
-    """Get user role"""
+    """Get user role (cached, see role_cache)"""
+    key = _user_cache_key(user_id)
+    role = role_cache.get(key)
+    if role is not None:
+        return role
+
     try:
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT role FROM users WHERE id = ?', (user_id,))
         result = cursor.fetchone()
         conn.close()
-        return result['role'] if result else 'user'
     except:
         return 'user'
 
+    if result is None:
+        return 'user'
+    role_cache.put(key, result['role'])
+    return result['role']
+
 def get_all_users(role_filter=None):
     """Get all users, optionally filtered by role"""
     try:
@@ -287,39 +1452,37 @@ def update_user_role(user_id, new_role):
         cursor.execute('UPDATE users SET role = ? WHERE id = ?', (new_role, user_id))
         conn.commit()
         conn.close()
+        invalidate_user_cache(user_id)
         return True
     except:
         return False
 
+def _get_counters(scope):
+    """Get {key: value} for one stats_counters scope"""
+    conn = get_connection()
+    rows = conn.execute('SELECT key, value FROM stats_counters WHERE scope = ?', (scope,)).fetchall()
+    conn.close()
+    return {row['key']: row['value'] for row in rows}
+
 def get_statistics():
     """Get system statistics"""
     try:
         conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Total users
-        cursor.execute('SELECT COUNT(*) as count FROM users')
-        total_users = cursor.fetchone()['count']
-        
-        # Admin count
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'admin'")
-        admin_count = cursor.fetchone()['count']
-        
-        # User count
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'user'")
-        user_count = cursor.fetchone()['count']
-        
-        # Total classifications
-        cursor.execute('SELECT COUNT(*) as count FROM analysis_history')
-        total_classifications = cursor.fetchone()['count']
-        
+        counters = {
+            (row['scope'], row['key']): row['value']
+            for row in conn.execute('''
+                SELECT scope, key, value FROM stats_counters
+                WHERE scope IN ('users', 'classifications')
+                   OR (scope = 'role' AND key IN ('admin', 'user'))
+            ''')
+        }
         conn.close()
-        
+
         return {
-            'total_users': total_users,
-            'admin_count': admin_count,
-            'user_count': user_count,
-            'total_classifications': total_classifications
+            'total_users': counters.get(('users', 'total'), 0),
+            'admin_count': counters.get(('role', 'admin'), 0),
+            'user_count': counters.get(('role', 'user'), 0),
+            'total_classifications': counters.get(('classifications', 'total'), 0)
         }
     except:
         return {
@@ -329,32 +1492,71 @@ def get_statistics():
             'total_classifications': 0
         }
 
-def get_recent_activities(limit=20):
-    """Get recent classification activities"""
+def get_disease_counts():
+    """Get classification count per predicted disease"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        return {disease: count for disease, count in _get_counters('disease').items() if count}
+    except:
+        return {}
 
-        cursor.execute('''
-            SELECT
-                ah.id,
-                u.username,
-                u.email,
-                ah.prediction,
-                ah.confidence,
-                ah.analysis_date,
-                ah.image_filename
-            FROM analysis_history ah
-            JOIN users u ON ah.user_id = u.id
-            ORDER BY ah.analysis_date DESC
-            LIMIT ?
-        ''', (limit,))
-
-        activities = cursor.fetchall()
+def get_daily_classification_counts(days=None):
+    """Get classification count per day (YYYY-MM-DD), oldest first; only the last `days` days if given"""
+    try:
+        counts = sorted((day, count) for day, count in _get_counters('day').items() if count)
+        return dict(counts[-days:] if days else counts)
+    except:
+        return {}
+
+def rebuild_statistics():
+    """Recompute stats_counters from users and analysis_history (repairs any drift)"""
+    conn = get_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        for statement in RESULTS_STATS_REBUILD:
+            conn.execute(statement)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        return [dict(activity) for activity in activities]
+    return get_statistics()
+
+RECENT_ACTIVITIES_QUERY = '''
+    SELECT
+        r.id,
+        u.username,
+        u.email,
+        d.name AS prediction,
+        r.confidence,
+        s.created_at AS analysis_date,
+        r.image_filename
+    FROM analysis_sessions s
+    CROSS JOIN analysis_results r ON r.session_id = s.id
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN disease_classes d ON d.id = r.disease_id
+    WHERE 1 = 1
+'''
+
+def get_recent_activities_page(limit=20, cursor=None):
+    """Get one page of classification activities, newest first: (rows, next_cursor)"""
+    try:
+        return _fetch_page(RECENT_ACTIVITIES_QUERY, (), cursor, limit)
     except:
-        return []
+        return [], None
+
+def get_recent_activities(limit=20):
+    """Get recent classification activities"""
+    return get_recent_activities_page(limit)[0]
+
+def iter_recent_activities(page_size=500):
+    """Yield all classification activities lazily, newest first"""
+    cursor = None
+    while True:
+        rows, cursor = get_recent_activities_page(page_size, cursor)
+        yield from rows
+        if cursor is None:
+            return
 
 def update_user_password(user_id, current_password, new_password):
     """Update user password with current password verification"""
@@ -363,29 +1565,33 @@ def update_user_password(user_id, current_password, new_password):
         cursor = conn.cursor()
 
         # First, verify current password
-        cursor.execute('SELECT password_hash, salt FROM users WHERE id = ?', (user_id,))
+        cursor.execute('SELECT password_hash, salt, hash_scheme FROM users WHERE id = ?', (user_id,))
         user_data = cursor.fetchone()
 
         if not user_data:
             conn.close()
             return False, "User tidak ditemukan! ❌"
 
-        if not verify_password(user_data['password_hash'], user_data['salt'], current_password):
+        if not verify_password(user_data['password_hash'], user_data['salt'], current_password,
+                               user_data['hash_scheme']):
             conn.close()
             return False, "Password saat ini salah! ❌"
 
         # If current password is correct, update to new password
-        pwd_hash, salt = hash_password(new_password)
+        pwd_hash, salt, scheme = hash_password(new_password)
 
         cursor.execute('''
             UPDATE users
-            SET password_hash = ?, salt = ?
+            SET password_hash = ?, salt = ?, hash_scheme = ?
             WHERE id = ?
-        ''', (pwd_hash, salt, user_id))
+        ''', (pwd_hash, salt, scheme, user_id))
 
         conn.commit()
         conn.close()
+        invalidate_user_cache(user_id)
         return True, "Password berhasil diubah! ✅"
+    except AuthTimeoutError:
+        return False, "Server sedang sibuk, silakan coba lagi! ⏳"
     except Exception as e:
         return False, f"Error updating password: {str(e)}"
 
@@ -409,11 +1615,9 @@ def update_user_profile(user_id, full_name=None, username=None):
 
         conn.commit()
         conn.close()
+        invalidate_user_cache(user_id)
         return True, "Profil berhasil diubah! ✅"
     except sqlite3.IntegrityError:
         return False, "Username sudah digunakan! ❌"
     except Exception as e:
-        return False, f"Error updating profile: {str(e)}"
-
-# Initialize database on import
-init_database()
\ No newline at end of file
+        return False, f"Error updating profile: {str(e)}"
\ No newline at end of file
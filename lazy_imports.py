@@ -0,0 +1,65 @@
+# lazy_imports.py - Lazy loading untuk dependency berat (TensorFlow, matplotlib, pandas, skimage)
+"""
+Modul berat baru di-import saat atribut pertamanya diakses, bukan saat modul
+yang memakainya di-import. Halaman yang tidak melakukan inference/plot
+(login, riwayat, pengaturan) tidak ikut membayar waktu import dan memori.
+
+Contoh:
+    tf = lazy_import('tensorflow')
+    feature = lazy_import('skimage.feature', optional=True)  # None jika tidak terinstal
+"""
+
+import importlib
+import importlib.util
+import threading
+
+class LazyModule:
+    """
+    Proxy modul: import sebenarnya terjadi saat atribut pertama diakses
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+    @property
+    def is_loaded(self):
+        return self.__dict__['_module'] is not None
+
+def is_available(name):
+    """
+    Cek apakah package top-level terinstal tanpa meng-import-nya
+    """
+    return importlib.util.find_spec(name.split('.')[0]) is not None
+
+def lazy_import(name, optional=False):
+    """
+    LazyModule untuk `name`; jika optional dan package tidak terinstal, kembalikan None
+    """
+    if optional and not is_available(name):
+        return None
+    return LazyModule(name)
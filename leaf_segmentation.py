@@ -1,12 +1,175 @@
-ap# leaf_segmentation.py - Object Detection & Segmentation untuk Daun Singkong
+# leaf_segmentation.py - Object Detection & Segmentation untuk Daun Singkong
 import cv2
 import numpy as np
 from PIL import Image
-import tensorflow as tf
-from tensorflow.keras.applications import VGG16
-from tensorflow.keras.layers import Conv2D, UpSampling2D, Concatenate
-from tensorflow.keras.models import Model
 import os
+import threading
+
+from lazy_imports import lazy_import
+
+# TensorFlow baru di-import saat model pertama kali dimuat/dibuat
+tf = lazy_import('tensorflow')
+
+class ModelRegistry:
+    """
+    Registry model bersama untuk satu proses (thread-safe)
+    Setiap file model dimuat sekali, di-key berdasarkan path dan mtime file,
+    dan otomatis dimuat ulang ketika file model berubah
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (mtime, model)
+        self._load_locks = {}  # key -> lock agar satu path hanya dimuat sekali
+
+    @staticmethod
+    def _make_key(model_path, variant):
+        return (os.path.abspath(model_path), variant)
+
+    @staticmethod
+    def _file_mtime(model_path):
+        try:
+            return os.path.getmtime(model_path)
+        except OSError:
+            return None  # File belum ada (model dibuat baru)
+
+    def get(self, model_path, loader, variant='keras'):
+        """
+        Ambil model dari registry, muat dengan `loader(model_path)` jika belum ada
+        atau jika file model sudah berubah sejak terakhir dimuat
+        """
+        key = self._make_key(model_path, variant)
+        mtime = self._file_mtime(model_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Cek ulang: thread lain mungkin sudah selesai memuat model ini
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == mtime:
+                    return entry[1]
+
+            if entry is not None:
+                print(f"🔄 File model berubah, memuat ulang: {model_path}")
+            model = loader(model_path)
+
+            with self._lock:
+                self._entries[key] = (mtime, model)
+
+        return model
+
+    def evict(self, model_path=None, variant=None):
+        """
+        Hapus model dari registry
+        Tanpa argumen, semua model dihapus. Mengembalikan jumlah entry yang dihapus
+        """
+        with self._lock:
+            if model_path is None:
+                keys = list(self._entries)
+            else:
+                path = os.path.abspath(model_path)
+                keys = [key for key in self._entries
+                        if key[0] == path and (variant is None or key[1] == variant)]
+
+            for key in keys:
+                del self._entries[key]
+                self._load_locks.pop(key, None)
+
+        return len(keys)
+
+    def loaded_models(self):
+        """
+        Daftar model yang sedang dimuat: [(path, variant, mtime), ...]
+        """
+        with self._lock:
+            return [(path, variant, mtime) for (path, variant), (mtime, _) in self._entries.items()]
+
+class InferenceModel:
+    """
+    Wrapper model Keras khusus inference
+    Forward pass dijalankan lewat tf.function dengan input signature tetap,
+    tanpa mesin dataset/callback milik Model.predict
+    """
+
+    def __init__(self, model, input_shape=(224, 224, 3)):
+        self.model = model
+        self.input_shape = input_shape
+        self._forward = tf.function(
+            self._call,
+            input_signature=[tf.TensorSpec(shape=(None,) + tuple(input_shape), dtype=tf.float32)]
+        )
+
+    def _call(self, input_batch):
+        return self.model(input_batch, training=False)
+
+    def predict(self, input_batch, batch_size=None, verbose=0):
+        """
+        Interface sama dengan Model.predict (batch_size/verbose diabaikan)
+        """
+        input_batch = tf.convert_to_tensor(input_batch, dtype=tf.float32)
+        return self._forward(input_batch).numpy()
+
+class TFLiteModel:
+    """
+    Runtime TFLite (hasil export model_export.py) dengan interface predict yang sama
+    Mendukung model float, dynamic-range, maupun int8 (input/output terkuantisasi)
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self.input_detail['shape'][0])
+        self._lock = threading.Lock()  # Interpreter tidak thread-safe
+
+    def _resize_batch(self, batch_size):
+        if batch_size != self._batch_size:
+            shape = list(self.input_detail['shape'])
+            shape[0] = batch_size
+            self.interpreter.resize_tensor_input(self.input_detail['index'], shape)
+            self.interpreter.allocate_tensors()
+            self.input_detail = self.interpreter.get_input_details()[0]
+            self.output_detail = self.interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict(self, input_batch, batch_size=None, verbose=0):
+        """
+        Interface sama dengan Model.predict (batch_size/verbose diabaikan)
+        """
+        input_batch = np.asarray(input_batch, dtype=np.float32)
+
+        with self._lock:
+            self._resize_batch(len(input_batch))
+
+            # Kuantisasi input jika model int8/uint8
+            input_dtype = self.input_detail['dtype']
+            if input_dtype != np.float32:
+                scale, zero_point = self.input_detail['quantization']
+                # Clip sebelum cast: nilai di luar rentang int8/uint8 harus saturasi, bukan wrap-around
+                info = np.iinfo(input_dtype)
+                input_batch = np.clip(np.round(input_batch / scale + zero_point),
+                                      info.min, info.max).astype(input_dtype)
+
+            self.interpreter.set_tensor(self.input_detail['index'], input_batch)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.output_detail['index'])
+
+            # Dequantize output
+            if self.output_detail['dtype'] != np.float32:
+                scale, zero_point = self.output_detail['quantization']
+                output = (output.astype(np.float32) - zero_point) * scale
+
+        return output
+
+# Registry global: dipakai bersama oleh semua LeafSegmenter (dan semua sesi Streamlit)
+model_registry = ModelRegistry()
 
 class LeafSegmenter:
     """
@@ -14,9 +177,20 @@ class LeafSegmenter:
     Menggunakan U-Net architecture dengan VGG16 backbone
     """
 
-    def __init__(self, model_path=None):
+    DEFAULT_MODEL_PATHS = {
+        'keras': "models/leaf_segmentation_model.h5",
+        'tflite': "models/leaf_segmentation_model_dynamic.tflite"
+    }
+
+    def __init__(self, model_path=None, max_batch_size=16, inference_only=True, backend='keras'):
+        if backend not in self.DEFAULT_MODEL_PATHS:
+            raise ValueError(f"Backend tidak dikenal: {backend}")
+
         self.model = None
-        self.model_path = model_path or "models/leaf_segmentation_model.h5"
+        self.backend = backend  # 'keras' atau 'tflite' (lihat model_export.py)
+        self.model_path = model_path or self.DEFAULT_MODEL_PATHS[backend]
+        self.max_batch_size = max_batch_size  # Batas gambar per forward pass
+        self.inference_only = inference_only  # False jika model perlu di-compile untuk training
         self.load_or_create_model()
 
     def create_unet_model(self, input_shape=(224, 224, 3)):
@@ -24,7 +198,7 @@ class LeafSegmenter:
         Membuat model U-Net untuk segmentasi daun
         """
         # Encoder (VGG16 backbone)
-        base_model = VGG16(weights='imagenet', include_top=False, input_shape=input_shape)
+        base_model = tf.keras.applications.VGG16(weights='imagenet', include_top=False, input_shape=input_shape)
 
         # Encoder layers
         s1 = base_model.get_layer('block1_conv2').output
@@ -40,43 +214,90 @@ class LeafSegmenter:
         d4 = self.decoder_block(d3, s1, 64)
 
         # Output
-        outputs = Conv2D(1, 1, padding='same', activation='sigmoid')(d4)
+        outputs = tf.keras.layers.Conv2D(1, 1, padding='same', activation='sigmoid')(d4)
 
-        model = Model(base_model.input, outputs, name='Leaf_Segmentation_UNet')
+        model = tf.keras.models.Model(base_model.input, outputs, name='Leaf_Segmentation_UNet')
         return model
 
     def decoder_block(self, input_tensor, skip_tensor, num_filters):
         """
         Decoder block untuk U-Net
         """
-        x = UpSampling2D((2, 2))(input_tensor)
-        x = Concatenate()([x, skip_tensor])
-        x = Conv2D(num_filters, 3, padding='same', activation='relu')(x)
-        x = Conv2D(num_filters, 3, padding='same', activation='relu')(x)
+        layers = tf.keras.layers
+        x = layers.UpSampling2D((2, 2))(input_tensor)
+        x = layers.Concatenate()([x, skip_tensor])
+        x = layers.Conv2D(num_filters, 3, padding='same', activation='relu')(x)
+        x = layers.Conv2D(num_filters, 3, padding='same', activation='relu')(x)
         return x
 
+    @classmethod
+    def resolve_model(cls, backend='keras', model_path=None):
+        """
+        (backend, model_path) yang akan dipakai, termasuk fallback ke Keras jika file TFLite tidak ada
+        """
+        model_path = model_path or cls.DEFAULT_MODEL_PATHS[backend]
+        if backend == 'tflite' and not os.path.exists(model_path):
+            return 'keras', cls.DEFAULT_MODEL_PATHS['keras']
+        return backend, model_path
+
     def load_or_create_model(self):
         """
         Load model yang sudah ada atau buat model baru
+        Model diambil dari registry global sehingga hanya dimuat sekali per proses
+        """
+        if self.backend == 'tflite':
+            if os.path.exists(self.model_path):
+                self.model = model_registry.get(self.model_path, TFLiteModel, variant='tflite')
+                return
+            print(f"⚠️ Model TFLite tidak ditemukan: {self.model_path}, menggunakan Keras")
+            self.backend, self.model_path = self.resolve_model('tflite', self.model_path)
+
+        if self.inference_only:
+            self.model = model_registry.get(self.model_path, self._build_inference_model,
+                                            variant='keras_inference')
+        else:
+            self.model = model_registry.get(self.model_path, self._build_model)
+
+    def _load_keras_model(self, model_path, compile=True):
         """
-        if os.path.exists(self.model_path):
+        Muat model Keras dari file, atau buat U-Net baru jika gagal/tidak ada
+        """
+        if os.path.exists(model_path):
             try:
-                self.model = tf.keras.models.load_model(self.model_path)
+                model = tf.keras.models.load_model(model_path, compile=compile)
                 print("✅ Model segmentasi daun berhasil dimuat")
             except Exception as e:
                 print(f"⚠️ Gagal load model: {e}, membuat model baru")
-                self.model = self.create_unet_model()
+                model = self.create_unet_model()
         else:
             print("🆕 Membuat model segmentasi daun baru")
-            self.model = self.create_unet_model()
+            model = self.create_unet_model()
+
+        return model
+
+    def _build_inference_model(self, model_path):
+        """
+        Muat model tanpa compile dan tanpa state training (optimizer/metrics)
+        Dipanggil oleh registry hanya ketika model belum ada di cache
+        """
+        return InferenceModel(self._load_keras_model(model_path, compile=False))
+
+    def _build_model(self, model_path):
+        """
+        Muat model dari file (atau buat baru) lalu compile
+        Dipanggil oleh registry hanya ketika model belum ada di cache
+        """
+        model = self._load_keras_model(model_path)
 
         # Compile model
-        self.model.compile(
+        model.compile(
             optimizer='adam',
             loss='binary_crossentropy',
             metrics=['accuracy']
         )
 
+        return model
+
     def preprocess_image(self, image):
         """
         Preprocessing gambar untuk segmentasi
@@ -95,6 +316,29 @@ class LeafSegmenter:
 
         return image_array
 
+    def preprocess_batch(self, images):
+        """
+        Preprocessing banyak gambar sekaligus menjadi satu tensor (N, 224, 224, 3)
+        """
+        return np.stack([self.preprocess_image(image) for image in images])
+
+    def predict_masks(self, input_batch):
+        """
+        Prediksi mask untuk batch yang sudah dipreprocess
+        Batch dipecah per `max_batch_size` agar memori tetap terkendali
+        """
+        batch_size = self.max_batch_size or len(input_batch)
+        masks = []
+
+        for start in range(0, len(input_batch), batch_size):
+            chunk = input_batch[start:start + batch_size]
+            masks.append(self.model.predict(chunk, batch_size=len(chunk), verbose=0))
+
+        # Threshold mask
+        masks = (np.concatenate(masks, axis=0) > 0.5).astype(np.uint8)
+
+        return masks[..., 0]
+
     def segment_leaf(self, image):
         """
         Segmentasi daun dari gambar
@@ -104,12 +348,22 @@ class LeafSegmenter:
         input_image = np.expand_dims(processed_image, axis=0)
 
         # Predict mask
-        mask = self.model.predict(input_image, verbose=0)[0]
+        return self.predict_masks(input_image)[0]
 
-        # Threshold mask
-        mask = (mask > 0.5).astype(np.uint8)
+    def segment_batch(self, images):
+        """
+        Segmentasi banyak gambar dengan satu forward pass per batch
+        Mengembalikan (masks, crops): list mask dan list region daun per gambar
+        """
+        images = [Image.open(image).convert('RGB') if isinstance(image, str) else image
+                  for image in images]
+        if not images:
+            return [], []
 
-        return mask.squeeze()
+        masks = list(self.predict_masks(self.preprocess_batch(images)))
+        crops = [self.extract_leaf_region(image, mask) for image, mask in zip(images, masks)]
+
+        return masks, crops
 
     def extract_leaf_region(self, image, mask, padding=10):
         """
@@ -169,19 +423,57 @@ class LeafSegmenter:
             # Return original image if segmentation fails
             return Image.open(image_path).convert('RGB'), None
 
+    def process_images_for_classification(self, image_paths):
+        """
+        Versi batch dari process_image_for_classification
+        Mengembalikan list (leaf_region, mask) dengan urutan sama seperti input
+        """
+        original_images = [Image.open(image_path).convert('RGB') for image_path in image_paths]
+
+        try:
+            masks, crops = self.segment_batch(original_images)
+        except Exception as e:
+            print(f"❌ Error dalam segmentasi batch: {e}")
+            # Return original images if segmentation fails
+            return [(image, None) for image in original_images]
+
+        results = []
+        for leaf_region, mask in zip(crops, masks):
+            # Convert back to PIL Image
+            if isinstance(leaf_region, np.ndarray):
+                leaf_region = Image.fromarray(leaf_region)
+            results.append((leaf_region, mask))
+
+        return results
+
 class LeafDetector:
     """
     Class untuk deteksi daun menggunakan color thresholding
     Alternatif yang lebih sederhana dari deep learning segmentation
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, working_size=1024):
+        # Sisi terpanjang (px) untuk thresholding & morfologi; None = resolusi penuh
+        self.working_size = working_size
+
+    def _downscale(self, array, interpolation):
+        """
+        Perkecil array ke resolusi kerja dengan faktor bulat (jalur cepat INTER_AREA)
+        Mengembalikan (array_kecil, scale) dengan scale <= 1.0
+        """
+        if not self.working_size or max(array.shape[:2]) <= self.working_size:
+            return array, 1.0
+
+        factor = -(-max(array.shape[:2]) // self.working_size)  # ceil division
+        working_size = (max(1, array.shape[1] // factor), max(1, array.shape[0] // factor))
+        return cv2.resize(array, working_size, interpolation=interpolation), 1.0 / factor
 
     def detect_leaf_color_threshold(self, image):
         """
         Deteksi daun singkong menggunakan color thresholding yang lebih spesifik
         Fokus pada warna hijau khas daun singkong
+        Thresholding & morfologi dijalankan pada salinan yang diperkecil ke
+        `working_size`, lalu mask diperbesar kembali ke resolusi asli
         """
         # Convert to numpy array
         if isinstance(image, Image.Image):
@@ -189,6 +481,9 @@ class LeafDetector:
         else:
             image_array = image
 
+        original_size = (image_array.shape[1], image_array.shape[0])
+        image_array, scale = self._downscale(image_array, cv2.INTER_AREA)
+
         # Convert to HSV
         hsv = cv2.cvtColor(image_array, cv2.COLOR_RGB2HSV)
 
@@ -213,38 +508,57 @@ class LeafDetector:
         combined_mask = mask & brightness_mask & saturation_mask
 
         # Morphological operations to clean mask
-        kernel = np.ones((7, 7), np.uint8)  # Larger kernel for better cleaning
+        # Larger kernel for better cleaning (7x7 at full resolution, scaled to working size)
+        kernel_size = max(3, int(round(7 * scale)) | 1)
+        kernel = np.ones((kernel_size, kernel_size), np.uint8)
         combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel)
         combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel)
 
         # Additional filtering: remove small noise
-        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(combined_mask, connectivity=8)
+        min_area = 500 * scale * scale  # Minimum area for cassava leaf region
+        filtered_mask = self.filter_small_components(combined_mask, min_area)
 
-        # Keep only components larger than minimum area (filter noise)
-        min_area = 500  # Minimum area for cassava leaf region
-        filtered_mask = np.zeros_like(combined_mask)
+        # Upsample mask back to original resolution for cropping
+        if scale < 1.0:
+            filtered_mask = cv2.resize(filtered_mask, original_size, interpolation=cv2.INTER_LINEAR)
+            _, filtered_mask = cv2.threshold(filtered_mask, 127, 255, cv2.THRESH_BINARY)
 
-        for i in range(1, num_labels):  # Skip background (label 0)
-            if stats[i, cv2.CC_STAT_AREA] > min_area:
-                filtered_mask[labels == i] = 255
+        return filtered_mask
 
-        return filtered_mask.astype(np.uint8)
+    def filter_small_components(self, mask, min_area=500):
+        """
+        Buang komponen terhubung yang luasnya <= min_area
+        Menggunakan lookup table per label sehingga mask dibuat dalam satu pass,
+        tidak bergantung pada jumlah komponen
+        """
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+        # keep_lut[label] = 255 jika komponen dipertahankan, 0 jika dibuang
+        keep_lut = np.where(stats[:, cv2.CC_STAT_AREA] > min_area, 255, 0).astype(np.uint8)
+        keep_lut[0] = 0  # Skip background (label 0)
+
+        return keep_lut[labels]
 
     def extract_largest_green_region(self, image, mask, min_area=2000):
         """
         Ekstrak region hijau terbesar dari gambar dengan fokus pada daun singkong
+        Pencarian kontur dijalankan pada mask yang diperkecil ke `working_size`;
+        hanya kontur terpilih yang diskalakan kembali ke resolusi asli
         """
+        working_mask, scale = self._downscale(mask, cv2.INTER_NEAREST)
+
         # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours, _ = cv2.findContours(working_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
         if not contours:
             return image  # Return original if no contours
 
         # Filter contours by area and shape characteristics typical for cassava leaves
+        # (circularity and aspect ratio are scale-invariant, area is not)
         valid_contours = []
         for cnt in contours:
             area = cv2.contourArea(cnt)
-            if area > min_area:
+            if area > min_area * scale * scale:
                 # Additional cassava leaf characteristics
                 perimeter = cv2.arcLength(cnt, True)
                 if perimeter > 0:
@@ -263,6 +577,9 @@ class LeafDetector:
 
         # Get largest contour by area
         largest_contour, _ = max(valid_contours, key=lambda x: x[1])
+        if scale < 1.0:
+            # Scale contour back to original resolution
+            largest_contour = np.round(largest_contour / scale).astype(np.int32)
 
         # Create mask for largest contour
         leaf_mask = np.zeros_like(mask)
@@ -275,8 +592,7 @@ class LeafDetector:
             image_array = image
 
         # Create RGBA image with transparency
-        rgba_image = np.zeros((image_array.shape[0], image_array.shape[1], 4), dtype=np.uint8)
-        rgba_image[:, :, :3] = image_array
+        rgba_image = cv2.cvtColor(image_array, cv2.COLOR_RGB2RGBA)
         rgba_image[:, :, 3] = leaf_mask
 
         return rgba_image
@@ -198,7 +198,7 @@ def login_page():
                         st.error("❌ Username sudah digunakan!")
                     else:
                         with st.spinner("🔄 Membuat akun..."):
-                            success, message = register_user(None, new_username, new_password, new_fullname)
+                            success, message, new_user_id = register_user(None, new_username, new_password, new_fullname)
                         if success:
                             st.success("✅ Akun berhasil dibuat! Silakan login dengan username dan password Anda.")
                             st.balloons()
@@ -206,16 +206,8 @@ def login_page():
                             st.session_state.authenticated = True
                             st.session_state.username = new_username
                             st.session_state.role = 'user'
-                            # Get user ID from database
-                            from database import get_connection
-                            conn = get_connection()
-                            cursor = conn.cursor()
-                            cursor.execute('SELECT id FROM users WHERE username = ?', (new_username,))
-                            user_data = cursor.fetchone()
-                            if user_data:
-                                st.session_state.user_id = user_data['id']
-                                st.session_state.user_profile = get_user_profile(user_data['id'])
-                            conn.close()
+                            st.session_state.user_id = new_user_id
+                            st.session_state.user_profile = get_user_profile(new_user_id)
                             st.rerun()
                         else:
                             st.error(f"❌ {message}")
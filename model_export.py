@@ -0,0 +1,200 @@
+# model_export.py - Export model ke TFLite (dynamic-range & int8) untuk server CPU
+"""
+Konversi model Keras (.h5) ke TFLite dengan dua varian kuantisasi:
+
+- dynamic : bobot int8, aktivasi float (tanpa data kalibrasi)
+- int8    : full integer, dikalibrasi dari folder gambar lokal
+
+Berlaku untuk model segmentasi U-Net (leaf_segmentation.py) maupun
+binary classifier VGG16 (binary_classifier_cnn.ipynb), karena keduanya
+menerima input 224x224 RGB yang dinormalisasi ke [0, 1].
+
+Contoh:
+    python model_export.py models/leaf_segmentation_model.h5 --calibration-dir dataset/binary_classification/val
+    python model_export.py model/binary_classifier.h5 --calibration-dir dataset/binary_classification/val
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image
+import tensorflow as tf
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+QUANTIZATION_VARIANTS = ('dynamic', 'int8')
+
+def load_image_folder(image_dir, limit=100, image_size=(224, 224)):
+    """
+    Muat gambar dari folder (rekursif) sebagai array float32 (N, H, W, 3) bernilai [0, 1]
+    Preprocessing sama dengan LeafSegmenter.preprocess_image
+    """
+    image_paths = []
+    for root, _, files in os.walk(image_dir):
+        for filename in sorted(files):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                image_paths.append(os.path.join(root, filename))
+
+    image_paths = sorted(image_paths)[:limit]
+    if not image_paths:
+        raise ValueError(f"Tidak ada gambar di folder: {image_dir}")
+
+    images = []
+    for path in image_paths:
+        image = Image.open(path).convert('RGB').resize(image_size, Image.Resampling.LANCZOS)
+        images.append(np.array(image, dtype=np.float32) / 255.0)
+
+    return np.stack(images)
+
+def convert_model(model, variant, calibration_images=None):
+    """
+    Konversi model Keras ke TFLite flatbuffer (bytes)
+    """
+    if variant not in QUANTIZATION_VARIANTS:
+        raise ValueError(f"Varian tidak dikenal: {variant}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if variant == 'int8':
+        if calibration_images is None or len(calibration_images) == 0:
+            raise ValueError("Kuantisasi int8 membutuhkan gambar kalibrasi")
+
+        def representative_dataset():
+            for image in calibration_images:
+                yield [image[np.newaxis, ...].astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        # Semua operasi integer; input/output tetap float agar interface tidak berubah
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    return converter.convert()
+
+def export_model(model_path, output_dir=None, calibration_dir=None, variants=QUANTIZATION_VARIANTS,
+                 num_calibration=100):
+    """
+    Export model .h5 ke file TFLite untuk setiap varian
+    Mengembalikan dict {variant: path_tflite}
+    """
+    output_dir = output_dir or os.path.dirname(model_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(model_path))[0]
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+
+    calibration_images = None
+    if 'int8' in variants:
+        if not calibration_dir:
+            raise ValueError("--calibration-dir wajib untuk varian int8")
+        calibration_images = load_image_folder(calibration_dir, limit=num_calibration,
+                                               image_size=tuple(model.input_shape[1:3]))
+
+    exported = {}
+    for variant in variants:
+        print(f"🔧 Konversi {base_name} -> {variant}...")
+        tflite_model = convert_model(model, variant, calibration_images)
+
+        tflite_path = os.path.join(output_dir, f"{base_name}_{variant}.tflite")
+        with open(tflite_path, 'wb') as f:
+            f.write(tflite_model)
+
+        print(f"💾 Disimpan: {tflite_path} ({len(tflite_model) / 1e6:.1f} MB)")
+        exported[variant] = tflite_path
+
+    return exported
+
+def _measure_latency(predict_fn, images, repeats=3):
+    """
+    Rata-rata latency per gambar (ms) dengan batch 1, setelah satu kali warm-up
+    """
+    predict_fn(images[:1])
+    timings = []
+    for _ in range(repeats):
+        for image in images:
+            start = time.perf_counter()
+            predict_fn(image[np.newaxis, ...])
+            timings.append(time.perf_counter() - start)
+    return float(np.mean(timings) * 1000)
+
+def compare_variants(model_path, tflite_paths, image_dir, num_images=50, report_path=None):
+    """
+    Bandingkan akurasi & latency varian TFLite terhadap model Keras fp32
+
+    Akurasi diukur relatif terhadap output fp32:
+    - agreement: proporsi output yang sama setelah threshold 0.5
+      (per piksel untuk segmentasi, per gambar untuk classifier)
+    - mae: rata-rata selisih absolut probabilitas
+    """
+    from leaf_segmentation import InferenceModel, TFLiteModel
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    keras_model = InferenceModel(model, input_shape=tuple(model.input_shape[1:]))
+    images = load_image_folder(image_dir, limit=num_images, image_size=keras_model.input_shape[:2])
+    reference = keras_model.predict(images)
+
+    report = {
+        'model_path': model_path,
+        'num_images': int(len(images)),
+        'variants': {
+            'keras_fp32': {
+                'size_mb': os.path.getsize(model_path) / 1e6,
+                'latency_ms': _measure_latency(keras_model.predict, images),
+                'agreement': 1.0,
+                'mae': 0.0
+            }
+        }
+    }
+
+    for variant, tflite_path in tflite_paths.items():
+        tflite_model = TFLiteModel(tflite_path)
+        outputs = tflite_model.predict(images)
+        report['variants'][variant] = {
+            'size_mb': os.path.getsize(tflite_path) / 1e6,
+            'latency_ms': _measure_latency(tflite_model.predict, images),
+            'agreement': float(np.mean((outputs > 0.5) == (reference > 0.5))),
+            'mae': float(np.mean(np.abs(outputs - reference)))
+        }
+
+    print(f"\n📊 Perbandingan varian ({report['num_images']} gambar):")
+    print(f"{'Varian':<12} {'Ukuran (MB)':>12} {'Latency (ms)':>13} {'Agreement':>10} {'MAE':>8}")
+    for variant, stats in report['variants'].items():
+        print(f"{variant:<12} {stats['size_mb']:>12.1f} {stats['latency_ms']:>13.2f} "
+              f"{stats['agreement']:>10.4f} {stats['mae']:>8.4f}")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report disimpan: {report_path}")
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Export model Keras ke TFLite (dynamic-range & int8)")
+    parser.add_argument('model_path', help="Path model .h5 (segmentasi atau binary classifier)")
+    parser.add_argument('--output-dir', help="Folder output .tflite (default: folder model)")
+    parser.add_argument('--calibration-dir', help="Folder gambar untuk kalibrasi int8 dan report")
+    parser.add_argument('--variants', nargs='+', default=list(QUANTIZATION_VARIANTS),
+                        choices=QUANTIZATION_VARIANTS)
+    parser.add_argument('--num-calibration', type=int, default=100,
+                        help="Jumlah gambar kalibrasi int8")
+    parser.add_argument('--num-eval', type=int, default=50,
+                        help="Jumlah gambar untuk report akurasi/latency")
+    parser.add_argument('--no-report', action='store_true', help="Lewati report perbandingan")
+    args = parser.parse_args()
+
+    exported = export_model(args.model_path, args.output_dir, args.calibration_dir,
+                            args.variants, args.num_calibration)
+
+    if not args.no_report:
+        if not args.calibration_dir:
+            print("⚠️ Report dilewati: --calibration-dir tidak diberikan")
+            return
+        base_name = os.path.splitext(os.path.basename(args.model_path))[0]
+        report_dir = os.path.dirname(exported[args.variants[0]])
+        report_path = os.path.join(report_dir, f"{base_name}_tflite_report.json")
+        compare_variants(args.model_path, exported, args.calibration_dir, args.num_eval, report_path)
+
+if __name__ == "__main__":
+    main()
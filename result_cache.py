@@ -0,0 +1,298 @@
+# result_cache.py - Cache hasil deteksi berbasis hash konten gambar
+"""
+Cache dua tingkat untuk pipeline deteksi (segmentasi + fitur + klasifikasi).
+
+Key  : SHA-256 dari byte gambar + versi pipeline (mode segmentasi, model, classifier)
+Tier : in-memory LRU -> SQLite on-disk, keduanya dibatasi ukuran (bytes)
+
+Kedua tier menyimpan hasil dalam bentuk pickle, sehingga setiap get()
+mengembalikan salinan baru yang aman diubah oleh pemanggil. Mask disimpan
+sebagai PNG agar satu hasil gambar 12 MP tidak menghabiskan budget memori.
+
+Upload ulang gambar yang sama akan langsung mengembalikan hasil dari cache
+tanpa memanggil model sama sekali.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_DB_FILE = "cache/detection_cache.db"
+
+def image_cache_key(image_bytes, model_version):
+    """
+    Key cache: SHA-256 dari byte gambar dan versi model
+    """
+    digest = hashlib.sha256(image_bytes)
+    digest.update(b'\0')
+    digest.update(str(model_version).encode('utf-8'))
+    return digest.hexdigest()
+
+def model_version_for(*model_paths):
+    """
+    Versi model dari nama, ukuran, dan mtime file model
+    Berubah otomatis ketika file model diganti
+    """
+    parts = []
+    for path in model_paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}")
+        except OSError:
+            parts.append(f"{os.path.basename(path)}:missing")
+    return '|'.join(parts)
+
+def encode_mask(mask):
+    """
+    Mask uint8 (0/1 atau 0/255) -> PNG bytes (lossless, jauh lebih kecil dari array mentah)
+    """
+    import cv2
+    ok, encoded = cv2.imencode('.png', np.ascontiguousarray(mask, dtype=np.uint8))
+    if not ok:
+        raise ValueError("Mask tidak bisa di-encode ke PNG")
+    return encoded.tobytes()
+
+def decode_mask(data):
+    """
+    PNG bytes dari encode_mask -> mask uint8 asli
+    """
+    import cv2
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+class ResultCache:
+    """
+    Cache hasil deteksi: LRU di memori + SQLite di disk
+    """
+
+    def __init__(self, db_path=CACHE_DB_FILE, memory_max_bytes=64 * 1024 * 1024,
+                 disk_max_bytes=512 * 1024 * 1024):
+        self.db_path = db_path
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (pickle blob, size)
+        self._memory_bytes = 0
+        self._stats = {
+            'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'puts': 0,
+            'memory_evictions': 0, 'disk_evictions': 0
+        }
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_results_last_access ON results (last_access)')
+        self._conn.commit()
+
+    def _remember(self, key, blob, size):
+        """
+        Simpan ke tier memori dan buang entry LRU jika melebihi batas (dipanggil dengan lock)
+        """
+        if size > self.memory_max_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (blob, size)
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._stats['memory_evictions'] += 1
+
+    def get(self, key):
+        """
+        Ambil hasil dari cache, None jika tidak ada
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return pickle.loads(entry[0])
+
+            row = self._conn.execute('SELECT value, size FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+
+            self._conn.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+            self._remember(key, row[0], row[1])
+            self._stats['disk_hits'] += 1
+            return pickle.loads(row[0])
+
+    def put(self, key, value):
+        """
+        Simpan hasil ke kedua tier
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(blob)
+
+        with self._lock:
+            self._remember(key, blob, size)
+            self._stats['puts'] += 1
+
+            self._conn.execute('''
+                INSERT OR REPLACE INTO results (key, value, size, last_access)
+                VALUES (?, ?, ?, ?)
+            ''', (key, blob, size, time.time()))
+            self._evict_disk()
+            self._conn.commit()
+
+    def _evict_disk(self):
+        """
+        Hapus entry yang paling lama tidak diakses sampai total ukuran di bawah batas
+        (dipanggil dengan lock)
+        """
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+
+        cursor = self._conn.execute('SELECT key, size FROM results ORDER BY last_access ASC')
+        evicted = []
+        for key, size in cursor:
+            if total <= self.disk_max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+
+        self._conn.executemany('DELETE FROM results WHERE key = ?', evicted)
+        self._stats['disk_evictions'] += len(evicted)
+
+    def get_or_compute(self, key, compute_fn):
+        """
+        Ambil dari cache atau hitung dengan compute_fn() lalu simpan
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute_fn()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Kosongkan kedua tier
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._conn.execute('DELETE FROM results')
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Statistik hit/miss dan ukuran setiap tier
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+            row = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+            stats['disk_entries'], stats['disk_bytes'] = row
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """
+    Cache global untuk satu proses (dibuat saat pertama kali dipakai)
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
+
+def run_detection_pipeline(image_bytes, classify_fn=None, model_version=None, use_deep_learning=True,
+                           cache=None, classifier_version=None, segmentation_backend='keras',
+                           segmentation_model_path=None):
+    """
+    Pipeline deteksi lengkap dengan cache berbasis konten
+
+    Menjalankan segmentasi daun, fitur CassavaLeafAnalyzer + classify_leaf_type, dan
+    (opsional) `classify_fn(leaf_region)` untuk klasifikasi penyakit. Hasil disimpan
+    dengan key SHA-256(image_bytes + mode, backend & model segmentasi + versi classifier)
+    sehingga upload ulang gambar yang sama tidak memanggil model sama sekali, dan hasil
+    dari mode/backend/classifier lain tidak pernah dipakai ulang.
+    `classifier_version` wajib jika classify_fn diberikan, misalnya
+    model_version_for(path model classifier), agar model yang di-retrain tidak memakai cache lama.
+
+    Mengembalikan dict: mask, leaf_features, leaf_type, classification, cache_hit
+    """
+    from PIL import Image
+    from leaf_segmentation import LeafSegmenter, LeafDetector
+    from cassava_leaf_characteristics import CassavaLeafAnalyzer
+
+    if classify_fn is not None and classifier_version is None:
+        raise ValueError("classifier_version wajib diisi jika classify_fn diberikan "
+                         "(misalnya model_version_for(path model classifier))")
+
+    cache = cache or get_result_cache()
+    if use_deep_learning:
+        # Backend & file model yang benar-benar dipakai (termasuk fallback TFLite -> Keras)
+        segmentation_backend, segmentation_model_path = LeafSegmenter.resolve_model(
+            segmentation_backend, segmentation_model_path)
+        if model_version is None:
+            model_version = model_version_for(segmentation_model_path)
+        segmentation = [f"backend={segmentation_backend}", f"model={segmentation_model_path}", str(model_version)]
+    else:
+        segmentation = ['color_threshold']
+    pipeline_version = '|'.join(segmentation + [
+        'classifier=' + (str(classifier_version) if classify_fn is not None else 'none')])
+    key = image_cache_key(image_bytes, pipeline_version)
+
+    cached = cache.get(key)
+    if cached is not None:
+        return dict(cached, mask=decode_mask(cached['mask']), cache_hit=True)
+
+    image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+
+    # Segmentasi daun
+    if use_deep_learning:
+        segmenter = LeafSegmenter(segmentation_model_path, backend=segmentation_backend)
+        masks, crops = segmenter.segment_batch([image])
+        mask, leaf_region = masks[0], crops[0]
+    else:
+        detector = LeafDetector()
+        mask = detector.detect_leaf_color_threshold(image)
+        leaf_region = detector.extract_largest_green_region(image, mask)
+
+    # Fitur & identifikasi daun singkong
+    analyzer = CassavaLeafAnalyzer()
+    leaf_features = analyzer.extract_features(image)
+    leaf_type = analyzer.classify_leaf_type(*leaf_features)
+
+    # Klasifikasi penyakit (model dari halaman klasifikasi)
+    classification = classify_fn(leaf_region) if classify_fn is not None else None
+
+    result = {
+        'mask': mask,
+        'leaf_features': leaf_features,
+        'leaf_type': leaf_type,
+        'classification': classification
+    }
+    cache.put(key, dict(result, mask=encode_mask(mask)))
+
+    return dict(result, cache_hit=False)
@@ -0,0 +1,316 @@
+# train_binary_classifier.py - CLI training binary classifier tanpa notebook (headless, bisa di-resume)
+"""
+Training binary classifier (cassava vs non-cassava) dari command line untuk
+job malam di node CPU bersama:
+
+- konfigurasi dari file JSON (lihat DEFAULT_CONFIG, `--print-config`)
+- metrik per epoch ditulis bertahap ke model/training_history.json
+- checkpoint lengkap (bobot + state optimizer + state callback) setiap epoch
+  di model/checkpoints/; run yang terputus (preempted) dilanjutkan dari epoch
+  terakhir secara otomatis
+- tanpa plt.show(); evaluasi akhir ditulis ke model/metrics.json
+
+Jalankan:
+    python train_binary_classifier.py --config training_config.json
+    python train_binary_classifier.py --print-config > training_config.json
+    python train_binary_classifier.py --config training_config.json --fresh   # abaikan checkpoint lama
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+
+import tensorflow as tf
+
+from binary_classifier_data import (BATCH_SIZE, CACHE_DIR, DATA_DIR, create_binary_datasets, list_image_files,
+                                    write_json_atomic)
+from binary_classifier_eval import METRICS_PATH, evaluate_streaming, format_classification_report, save_metrics
+from binary_classifier_model import (LEARNING_RATE, assemble_binary_model, compile_binary_model,
+                                     create_binary_head, create_binary_vgg_model, create_callbacks,
+                                     set_precision_policy, to_float32_model)
+
+DEFAULT_CONFIG = {
+    'data_dir': DATA_DIR,
+    'cache_dir': CACHE_DIR,
+    'training_mode': 'end_to_end',      # 'end_to_end' atau 'bottleneck' (lihat bottleneck_features.py)
+    'epochs': 50,
+    'batch_size': BATCH_SIZE,
+    'learning_rate': LEARNING_RATE,
+    'mixed_precision': False,
+    'jit_compile': False,
+    'weights': 'imagenet',              # 'none' untuk bobot VGG16 acak (offline/testing)
+    'num_augmentations': 5,             # hanya untuk mode bottleneck
+    'early_stopping_patience': 8,
+    'lr_patience': 3,
+    'model_path': 'model/binary_classifier.h5',
+    'history_path': 'model/training_history.json',
+    'metrics_path': METRICS_PATH,
+    'checkpoint_dir': 'model/checkpoints'
+}
+TRAINING_MODES = ('end_to_end', 'bottleneck')
+
+# Boleh berbeda antara run yang terputus dan lanjutannya (misalnya menambah epoch)
+RESUMABLE_CHANGES = ('epochs',)
+
+# Atribut callback Keras yang perlu dipulihkan saat resume
+CALLBACK_STATE_ATTRIBUTES = ('best', 'wait', 'best_epoch', 'stopped_epoch', 'cooldown_counter')
+
+STATE_FILE = 'state.json'
+
+def load_config(path=None, overrides=None):
+    """
+    DEFAULT_CONFIG digabung dengan file JSON dan override CLI; key yang tidak dikenal ditolak
+    """
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        with open(path) as f:
+            config.update(json.load(f))
+    config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+
+    unknown = sorted(set(config) - set(DEFAULT_CONFIG))
+    if unknown:
+        raise ValueError(f"Key config tidak dikenal: {', '.join(unknown)}")
+    if config['training_mode'] not in TRAINING_MODES:
+        raise ValueError(f"training_mode harus salah satu dari {TRAINING_MODES}")
+    return config
+
+def _to_json_value(value):
+    return value.item() if hasattr(value, 'item') else value
+
+def load_resume_state(checkpoint_dir):
+    """
+    State checkpoint terakhir (dict) atau None jika belum ada
+    """
+    try:
+        with open(os.path.join(checkpoint_dir, STATE_FILE)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(os.path.join(checkpoint_dir, state['checkpoint'])):
+        return None
+    return state
+
+class TrainingHistoryLogger(tf.keras.callbacks.Callback):
+    """
+    Tambahkan metrik setiap epoch ke file JSON (ditulis ulang per epoch)
+    Saat resume, entry setelah epoch checkpoint dibuang agar tidak duplikat
+    """
+
+    def __init__(self, history_path, config, initial_epoch=0):
+        super().__init__()
+        self.history_path = history_path
+        self.config = config
+        self.initial_epoch = initial_epoch
+        self.epochs = []
+
+    def on_train_begin(self, logs=None):
+        self.epochs = []
+        if self.initial_epoch and os.path.exists(self.history_path):
+            with open(self.history_path) as f:
+                previous = json.load(f).get('epochs', [])
+            self.epochs = [entry for entry in previous if entry['epoch'] <= self.initial_epoch]
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        entry = {'epoch': epoch + 1}
+        entry.update({key: float(value) for key, value in (logs or {}).items()})
+        entry['epoch_seconds'] = time.perf_counter() - self._epoch_start
+        self.epochs.append(entry)
+        write_json_atomic(self.history_path, {'config': self.config, 'epochs': self.epochs})
+
+class ResumableCheckpoint(tf.keras.callbacks.Callback):
+    """
+    Checkpoint lengkap setiap epoch: model .keras (bobot + state optimizer) dan
+    state.json (epoch, config, state callback lain). Harus menjadi callback terakhir
+    agar state callback lain dipulihkan SETELAH mereka di-reset di on_train_begin.
+    """
+
+    def __init__(self, checkpoint_dir, config, callbacks, state=None):
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.config = config
+        self.callbacks = callbacks
+        self.state = state
+
+    def on_train_begin(self, logs=None):
+        if not self.state:
+            return
+        for callback in self.callbacks:
+            saved = self.state['callbacks'].get(type(callback).__name__, {})
+            for attribute, value in saved.items():
+                setattr(callback, attribute, value)
+
+    def _callback_state(self):
+        state = {}
+        for callback in self.callbacks:
+            attributes = {attribute: _to_json_value(getattr(callback, attribute))
+                          for attribute in CALLBACK_STATE_ATTRIBUTES if hasattr(callback, attribute)}
+            if attributes:
+                state[type(callback).__name__] = attributes
+        return state
+
+    def on_epoch_end(self, epoch, logs=None):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        filename = f"epoch_{epoch + 1:03d}.keras"
+        self.model.save(os.path.join(self.checkpoint_dir, filename))
+
+        optimizer = self.model.optimizer
+        self.state = {'epoch': epoch + 1, 'checkpoint': filename, 'config': self.config,
+                      'callbacks': self._callback_state(), 'stopped_early': False,
+                      'optimizer': {'class': type(optimizer).__name__,
+                                    'iterations': int(optimizer.iterations.numpy())}}
+        write_json_atomic(os.path.join(self.checkpoint_dir, STATE_FILE), self.state)
+
+        # Hanya checkpoint terbaru yang disimpan (state.json sudah menunjuk ke file baru)
+        for path in glob.glob(os.path.join(self.checkpoint_dir, 'epoch_*.keras')):
+            if os.path.basename(path) != filename:
+                os.remove(path)
+
+    def on_train_end(self, logs=None):
+        if self.state and self.model.stop_training:
+            self.state['stopped_early'] = True
+            write_json_atomic(os.path.join(self.checkpoint_dir, STATE_FILE), self.state)
+
+def _check_resume_config(state, config):
+    changed = [key for key in DEFAULT_CONFIG
+               if key not in RESUMABLE_CHANGES and state['config'].get(key) != config.get(key)]
+    if changed:
+        raise SystemExit(f"❌ Config berbeda dengan checkpoint ({', '.join(changed)}); "
+                         f"kembalikan config atau jalankan dengan --fresh")
+
+def _check_restored_optimizer(model, state):
+    """
+    Pastikan optimizer hasil load_model sama dengan saat checkpoint (class & iterations);
+    jika tidak, Keras diam-diam memakai optimizer default dan training tidak benar-benar dilanjutkan
+    """
+    expected = state.get('optimizer')
+    if not expected:
+        return
+    optimizer = model.optimizer
+    restored = {'class': type(optimizer).__name__ if optimizer else None,
+                'iterations': int(optimizer.iterations.numpy()) if optimizer else None}
+    if restored != expected:
+        raise SystemExit(f"❌ State optimizer checkpoint tidak terpulihkan ({restored} != {expected}); "
+                         f"jalankan dengan --fresh")
+
+def train(config, resume=True):
+    """
+    Training lengkap sesuai config; kembalikan dict metrik evaluasi akhir
+    """
+    checkpoint_dir = config['checkpoint_dir']
+    state = load_resume_state(checkpoint_dir) if resume else None
+    if state:
+        _check_resume_config(state, config)
+        print(f"🔄 Melanjutkan dari epoch {state['epoch']} ({state['checkpoint']})")
+    elif os.path.isdir(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    weights = None if config['weights'] in (None, 'none') else config['weights']
+    policy = set_precision_policy(config['mixed_precision'])
+    train_ds, val_ds = create_binary_datasets(config['data_dir'], config['batch_size'], config['cache_dir'])
+    initial_epoch = state['epoch'] if state else 0
+
+    bottleneck = config['training_mode'] == 'bottleneck'
+    if bottleneck:
+        from bottleneck_features import (FeatureSequence, build_feature_extractor, extract_features,
+                                         load_feature_store)
+
+        # Base VGG16 model lengkap dipakai sebagai extractor dan untuk menyusun model akhir
+        full_model = create_binary_vgg_model(weights)
+        extractor = build_feature_extractor(full_model.get_layer('vgg16'))
+        feature_dir = os.path.join(config['cache_dir'], 'features')
+        train_paths, train_labels, _ = list_image_files(os.path.join(config['data_dir'], 'train'), 'training')
+        val_paths, val_labels, _ = list_image_files(os.path.join(config['data_dir'], 'val'), 'validation')
+        train_features, train_labels = load_feature_store(extract_features(
+            extractor, train_paths, train_labels, 'train', config['num_augmentations'], feature_dir,
+            config['batch_size']))
+        val_features, val_labels = load_feature_store(extract_features(
+            extractor, val_paths, val_labels, 'val', 0, feature_dir, config['batch_size']))
+
+        fit_data = FeatureSequence(train_features, train_labels, batch_size=config['batch_size'])
+        fit_data.epoch = initial_epoch  # lanjutkan rotasi variant augmentasi
+        validation_data = (val_features[0], val_labels)
+
+        def build_model():
+            return create_binary_head(train_features.shape[-1])
+    else:
+        fit_data, validation_data = train_ds, val_ds
+
+        def build_model():
+            return create_binary_vgg_model(weights)
+
+    if state:
+        # Model, bobot, dan state optimizer (termasuk learning rate) dari checkpoint terakhir
+        model = tf.keras.models.load_model(os.path.join(checkpoint_dir, state['checkpoint']))
+        _check_restored_optimizer(model, state)
+    else:
+        model = compile_binary_model(build_model(), config['learning_rate'], jit_compile=config['jit_compile'])
+
+    # Checkpoint terbaik hanya bobot: menyimpan model penuh ke .h5 legacy membuang optimizer
+    # dari compile config, sehingga checkpoint .keras berikutnya tidak bisa di-resume
+    best_path = os.path.join(checkpoint_dir, 'best.weights.h5')
+    callbacks = create_callbacks(best_path, save_weights_only=True,
+                                 early_stopping_patience=config['early_stopping_patience'],
+                                 lr_patience=config['lr_patience'])
+    callbacks.append(TrainingHistoryLogger(config['history_path'], config, initial_epoch))
+    callbacks.append(ResumableCheckpoint(checkpoint_dir, config, list(callbacks), state))
+
+    print(f"\n🚀 Training {config['training_mode']} | epoch {initial_epoch + 1}-{config['epochs']} | "
+          f"batch {config['batch_size']} | lr {config['learning_rate']} | {policy} | XLA {config['jit_compile']}")
+    if state and state.get('stopped_early'):
+        print("⏹️ Run sebelumnya sudah berhenti (early stopping), training dilewati")
+    else:
+        model.fit(fit_data, epochs=config['epochs'], initial_epoch=initial_epoch,
+                  validation_data=validation_data, callbacks=callbacks, verbose=2)
+
+    # Model terbaik (val_accuracy) -> model float32 dengan layout model/binary_classifier.h5
+    if os.path.exists(best_path):
+        model.load_weights(best_path)
+    if bottleneck:
+        model = assemble_binary_model(full_model, model)
+
+    if policy != 'float32':
+        model = to_float32_model(model, config['learning_rate'])
+    else:
+        model = compile_binary_model(model, config['learning_rate'])
+    if os.path.dirname(config['model_path']):
+        os.makedirs(os.path.dirname(config['model_path']), exist_ok=True)
+    model.save(config['model_path'])
+    set_precision_policy(False)
+    print(f"💾 Model disimpan: {config['model_path']}")
+
+    metrics = evaluate_streaming(model, val_ds)
+    save_metrics(metrics, config['metrics_path'])
+    print("\n📊 Classification Report:")
+    print(format_classification_report(metrics))
+    print(f"📈 AUC: {metrics['auc']:.4f} | 💾 Metrik: {config['metrics_path']}")
+    return metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="Training binary classifier (headless, resumable)")
+    parser.add_argument('--config', help="File konfigurasi JSON (default: DEFAULT_CONFIG)")
+    parser.add_argument('--epochs', type=int, help="Override jumlah epoch")
+    parser.add_argument('--training-mode', choices=TRAINING_MODES, help="Override training_mode")
+    parser.add_argument('--fresh', action='store_true', help="Hapus checkpoint lama dan mulai dari awal")
+    parser.add_argument('--print-config', action='store_true', help="Cetak config efektif (JSON) lalu keluar")
+    args = parser.parse_args()
+
+    config = load_config(args.config, {'epochs': args.epochs, 'training_mode': args.training_mode})
+    if args.print_config:
+        json.dump(config, sys.stdout, indent=2)
+        print()
+        return
+
+    print("🌿 Binary Cassava Leaf Classification - headless training")
+    train(config, resume=not args.fresh)
+    print("\n✅ Training selesai!")
+
+if __name__ == "__main__":
+    main()